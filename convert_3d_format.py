@@ -11,31 +11,15 @@ Output format: STL, USDZ, FBX, MP4, or GIF.
 import argparse
 import json
 import os
+import stat
 import sys
-import urllib.request
 
-from tencentcloud.common.common_client import CommonClient
-from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
 
-from secrets import load_secrets
+from hy3d_client import get_client
 
 from cos_upload import resolve_input_to_url
-
-
-def get_client():
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
-
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+from download_utils import download_file
 
 
 def convert_3d_format(file_3d_url: str, output_format: str) -> str:
@@ -62,11 +46,6 @@ def convert_3d_format(file_3d_url: str, output_format: str) -> str:
     return result_url
 
 
-def download_file(url: str, output_path: str) -> None:
-    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    urllib.request.urlretrieve(url, output_path)
-
-
 def main():
     parser = argparse.ArgumentParser(
         description="Convert a 3D model to another format (Hunyuan Convert3DFormat API). Input: public URL or local path (FBX/OBJ/GLB, max 60 MB). Local files are uploaded to Tencent COS (public-read) when cos_bucket is set in secrets.",
@@ -104,18 +83,21 @@ Examples:
     if not input_ref:
         parser.error("file_3d_url is required")
     if not input_ref.startswith("http://") and not input_ref.startswith("https://"):
-        if not os.path.exists(input_ref):
+        # One stat serves both the existence and the size check
+        try:
+            st = os.stat(input_ref)
+        except OSError:
             print(f"❌ Local file not found: {input_ref}", file=sys.stderr)
             sys.exit(1)
+        if not stat.S_ISREG(st.st_mode):
+            print(f"❌ Not a regular file: {input_ref}", file=sys.stderr)
+            sys.exit(1)
         ext = os.path.splitext(input_ref.split("?")[0])[1].lower()
         if ext not in (".glb", ".obj", ".fbx", ".gltf"):
             print("⚠️  Warning: Convert3DFormat supports FBX, OBJ, GLB. Other formats may fail.", file=sys.stderr)
-        try:
-            size_mb = os.path.getsize(input_ref) / (1024 * 1024)
-            if size_mb > 60:
-                print(f"⚠️  Warning: File is {size_mb:.1f} MB. API limit is 60 MB.", file=sys.stderr)
-        except OSError:
-            pass
+        size_mb = st.st_size / (1024 * 1024)
+        if size_mb > 60:
+            print(f"⚠️  Warning: File is {size_mb:.1f} MB. API limit is 60 MB.", file=sys.stderr)
 
     try:
         url = resolve_input_to_url(input_ref)
@@ -134,8 +116,8 @@ Examples:
                 filename = os.path.basename(url_path) or f"converted.{args.format.lower()}"
                 out_path = os.path.join(out_path, filename)
             print(f"📥 Downloading to {out_path}...")
-            download_file(result_url, out_path)
-            print(f"✅ Saved: {os.path.abspath(out_path)}")
+            size = download_file(result_url, out_path)
+            print(f"✅ Saved: {os.path.abspath(out_path)} ({size / (1024 * 1024):.1f} MB)")
     except TencentCloudSDKException as err:
         raise SystemExit(f"API Error: {err}") from err
 
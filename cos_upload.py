@@ -6,20 +6,38 @@ Used by scripts that need a public URL for a local file (e.g. convert_3d_format.
 Configure cos_bucket and optional cos_region in your secrets file.
 """
 
+import hashlib
 import os
 import re
+from typing import BinaryIO
 
 from secrets import Hy3DSecrets, load_secrets
 
 
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
+def _sha256_of(f: BinaryIO) -> str:
+    """SHA-256 hex digest of an open binary file from its current position, read in chunks."""
+    h = hashlib.sha256()
+    for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
 def upload_local_file_to_cos(
     local_path: str,
     secrets: Hy3DSecrets,
     subfolder: str = "convert",
 ) -> str:
-    """Upload a local file to Tencent COS with public-read ACL; return the public URL."""
+    """
+    Upload a local file to Tencent COS with public-read ACL; return the public URL.
+
+    The object key includes a content hash, so re-running with the same file finds the
+    existing object via HEAD and skips the upload.
+    """
     try:
-        from qcloud_cos import CosConfig, CosS3Client
+        from qcloud_cos import CosConfig, CosS3Client, CosServiceError
     except ImportError:
         raise RuntimeError(
             "COS upload requires cos-python-sdk-v5. Install with: pip install cos-python-sdk-v5"
@@ -28,7 +46,6 @@ def upload_local_file_to_cos(
     bucket = secrets.cos_bucket
     region = secrets.cos_region or secrets.region
     filename = os.path.basename(local_path)
-    key = f"hy3d/{subfolder}/{filename}"
 
     config = CosConfig(
         Region=region,
@@ -37,17 +54,38 @@ def upload_local_file_to_cos(
     )
     client = CosS3Client(config)
 
+    # The file is opened once: hashed for the key, then rewound and uploaded only if HEAD misses.
     with open(local_path, "rb") as f:
-        body = f.read()
+        digest = _sha256_of(f)[:16]
+        size = f.tell()
+        key = f"hy3d/{subfolder}/{digest}_{filename}"
+        url = f"https://{bucket}.cos.{region}.myqcloud.com/{key}"
 
-    client.put_object(
-        Bucket=bucket,
-        Key=key,
-        Body=body,
-        ACL="public-read",
-    )
+        try:
+            client.head_object(Bucket=bucket, Key=key)
+            print("   Already in COS (same content), skipping upload.")
+            return url
+        except CosServiceError as e:
+            if e.get_status_code() != 404:
+                raise
+
+        if size <= secrets.cos_part_size_mb * 1024 * 1024:
+            # Single PUT streamed from the already-open (page-cached) handle
+            f.seek(0)
+            client.put_object(Bucket=bucket, Key=key, Body=f, ACL="public-read")
+        else:
+            # Multipart: parts are read from disk by MAXThread workers, never the whole file at once
+            client.upload_file(
+                Bucket=bucket,
+                Key=key,
+                LocalFilePath=local_path,
+                PartSize=secrets.cos_part_size_mb,
+                MAXThread=secrets.cos_concurrency,
+                EnableMD5=False,
+                ACL="public-read",
+            )
 
-    return f"https://{bucket}.cos.{region}.myqcloud.com/{key}"
+    return url
 
 
 def resolve_input_to_url(input_ref: str, subfolder: str = "convert") -> str:
@@ -5,10 +5,43 @@ Shared helpers for downloading 3D result files with optional base name (title).
 Exported files are named from the generating prompt or source filename when base_name is set.
 """
 
+import io
+import json
 import os
 import re
-import urllib.request
-from typing import Dict, List, Optional
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
+
+_CHUNK_SIZE = 1 << 20  # 1 MiB
+MAX_DOWNLOAD_WORKERS = 8  # concurrent result downloads per job
+_MAX_HEAD_WORKERS = 16
+
+# Byte sizes for CLI options: a number plus an optional K/M/G unit, "B"/"iB" suffix allowed
+_SIZE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+# Content-Range of a 206 ("bytes 100-199/200") or 416 ("bytes */200") reply
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)")
+
+# Chars invalid in filenames: \ / : * ? " < > | (plus whitespace)
+_INVALID_CHARS = re.compile(r'[\s\\/:*?"<>|]+')
+_MULTI_UND = re.compile(r"_+")
+
+
+def parse_size(s: str) -> int:
+    """Parse a byte size such as "65536", "512K", "8MB" or "1MiB" (binary units) for CLI options."""
+    m = _SIZE_RE.fullmatch(s.strip())
+    if not m:
+        raise ValueError(f"invalid size: {s!r} (use e.g. 512K, 8MB)")
+    size = int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+    if size < 1:
+        raise ValueError(f"size must be positive: {s!r}")
+    return size
 
 
 def sanitize_base_name(s: str, max_length: int = 120) -> str:
@@ -22,63 +55,269 @@ def sanitize_base_name(s: str, max_length: int = 120) -> str:
     s = os.path.basename(s.strip())
     # Remove extension for cleaner title when s was a filename
     s = os.path.splitext(s)[0]
-    # Replace chars invalid in filenames: \ / : * ? " < > |
-    s = re.sub(r'[\s\\/:*?"<>|]+', "_", s)
-    # Collapse multiple underscores
-    s = re.sub(r"_+", "_", s).strip("_")
+    # Replace chars invalid in filenames, then collapse multiple underscores
+    s = _INVALID_CHARS.sub("_", s)
+    s = _MULTI_UND.sub("_", s).strip("_")
     if not s:
         return "model"
     return s[:max_length] if len(s) > max_length else s
 
 
-def download_file(url: str, output_path: str) -> None:
-    """Download a file from URL to output_path."""
+def _content_range(r: "requests.Response") -> Tuple[Optional[int], Optional[int]]:
+    """(first byte, total length) from Content-Range ("bytes 0-9/10", "bytes */10"); None if absent."""
+    m = _CONTENT_RANGE_RE.match(r.headers.get("Content-Range", ""))
+    if not m:
+        return None, None
+    first, total = m.groups()
+    return (int(first) if first else None), (int(total) if total != "*" else None)
+
+
+def _read_resume_state(state_path: str) -> Optional[dict]:
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) and state.get("validator") else None
+
+
+def _write_resume_state(state_path: str, r: "requests.Response") -> None:
+    """
+    Record what a .part was started from, so a later run resumes it only against the same
+    object: a strong ETag (or Last-Modified) for If-Range plus the total size. Without a usable
+    validator, or if the body is content-encoded (Range offsets would not match the decoded
+    bytes on disk), nothing is recorded and an interrupted download restarts from scratch.
+    """
+    etag = r.headers.get("ETag", "")
+    validator = etag if etag and not etag.startswith("W/") else r.headers.get("Last-Modified")
+    if r.status_code == 206:
+        total = _content_range(r)[1]
+    else:
+        total = int(r.headers["Content-Length"]) if r.headers.get("Content-Length", "").isdigit() else None
+    if not validator or r.headers.get("Content-Encoding", "identity") != "identity":
+        _discard(state_path)
+        return
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump({"validator": validator, "size": total}, f)
+
+
+def _expected_size(r: "requests.Response", start: int, state: Optional[dict]) -> Optional[int]:
+    """
+    Bytes the .part should hold once r's body is written after start bytes: start plus an
+    unencoded Content-Length, else the total recorded for a resumed .part; None if unknown.
+    """
+    length = r.headers.get("Content-Length", "")
+    if length.isdigit() and r.headers.get("Content-Encoding", "identity") == "identity":
+        return start + int(length)
+    return state.get("size") if state else None
+
+
+def _discard(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def unique_base_names(names: List[str], max_length: int = 120) -> List[str]:
+    """
+    Sanitized base names for several jobs sharing one output directory: repeats (compared
+    case-insensitively, after sanitizing and truncation) get -2, -3 appended, so no two jobs
+    write the same files. "-" because plan_downloads already uses _2 for the files of one job.
+    """
+    taken = set()
+    unique = []
+    for name in names:
+        safe = sanitize_base_name(name, max_length)
+        while sanitize_base_name(safe, max_length) != safe:  # "a.b.c" -> "a": stable once reused
+            safe = sanitize_base_name(safe, max_length)
+        base, n = safe, 1
+        while base.lower() in taken:
+            n += 1
+            suffix = f"-{n}"
+            base = safe[: max_length - len(suffix)] + suffix
+        taken.add(base.lower())
+        unique.append(base)
+    return unique
+
+
+def download_file(
+    url: str,
+    output_path: str,
+    session: Optional["requests.Session"] = None,
+    chunk_size: int = _CHUNK_SIZE,
+    write_buffer: int = io.DEFAULT_BUFFER_SIZE,
+) -> int:
+    """
+    Download a file from URL to output_path, streaming it to disk in chunk_size (1 MiB) reads
+    through a write_buffer-sized file buffer. Larger values mean fewer syscalls and can raise
+    throughput where the network outpaces disk writes.
+    Uses the shared pooled SESSION unless another session is given.
+    Returns the size of the saved file in bytes, tracked while writing (no extra stat).
+
+    Data is written to output_path + ".part" and renamed into place only once complete, so an
+    interrupted download never leaves a truncated file under the final name. A leftover .part
+    is resumed with an HTTP Range request only if it can be shown to belong to the same object:
+    If-Range carries the ETag recorded when it was started (in output_path + ".part.json"),
+    bodies are requested unencoded so byte offsets match the file on disk, and the reply's
+    Content-Range must start at the .part size with the recorded total. Anything else (a
+    changed object, an oversized .part, a server ignoring Range) restarts the download.
+    A body shorter or longer than its Content-Length (or the recorded total) raises OSError
+    and leaves the .part in place.
+    """
+    if session is None:
+        from http_session import SESSION as session  # deferred: requests is slow to import
+
     parent = os.path.dirname(output_path)
     if parent:
         os.makedirs(parent, exist_ok=True)
-    urllib.request.urlretrieve(url, output_path)
+    tmp_path = output_path + ".part"
+    state_path = tmp_path + ".json"
+    state = _read_resume_state(state_path) if os.path.isfile(tmp_path) else None
+    start = os.path.getsize(tmp_path) if state else 0
+    if not state:
+        _discard(tmp_path, state_path)
+
+    while True:
+        headers = {"Accept-Encoding": "identity"}
+        if start:
+            headers["Range"] = f"bytes={start}-"
+            headers["If-Range"] = state["validator"]
+        with session.get(url, headers=headers, stream=True, timeout=(5, 60)) as r:
+            if start and r.status_code in (206, 416):
+                first, total = _content_range(r)
+                if r.status_code == 416:
+                    # Range starts at end of file: complete only if the server's size agrees
+                    if total is not None and total == start == state.get("size", total):
+                        os.replace(tmp_path, output_path)
+                        _discard(state_path)
+                        return start
+                    valid = False
+                else:
+                    valid = (
+                        first == start
+                        and total is not None
+                        and total == state.get("size", total)
+                        and r.headers.get("Content-Encoding", "identity") == "identity"
+                    )
+                if not valid:
+                    _discard(tmp_path, state_path)
+                    start = 0
+                    continue
+            if not r.ok:
+                _discard(tmp_path, state_path)
+                r.raise_for_status()
+            # 206 continues the partial file; a 200 means the server ignored Range or the
+            # object changed (If-Range mismatch), so the .part is rewritten from the start
+            resume = bool(start) and r.status_code == 206
+            if not resume:
+                _write_resume_state(state_path, r)
+            # r.raw bypasses requests' decoding; undo any gzip/deflate a server sent regardless
+            r.raw.decode_content = True
+            # On network errors or Ctrl-C the .part is kept so the next run can resume it
+            with open(tmp_path, "ab" if resume else "wb", buffering=write_buffer) as f:
+                shutil.copyfileobj(r.raw, f, length=chunk_size)
+                size = f.tell()
+            expected = _expected_size(r, start if resume else 0, state if resume else None)
+        break
+    # urllib3 1.x ends a cut-off body silently; keep the short .part for the next run to resume
+    if expected is not None and size != expected:
+        raise OSError(f"incomplete download: got {size} of {expected} bytes")
+    os.replace(tmp_path, output_path)
+    _discard(state_path)
+    return size
+
+
+_EXT_MAP = {
+    ".zip": ".zip",
+    ".obj": ".obj",
+    ".glb": ".glb",
+    ".gltf": ".glb",
+    ".fbx": ".fbx",
+    ".stl": ".stl",
+    ".png": ".png",
+    ".jpg": ".jpg",
+    ".jpeg": ".jpg",
+}
 
 
 def _ext_from_url(url: str, default: str = ".glb") -> str:
     """Get file extension from URL path (before query string)."""
-    path = url.split("?")[0].lower()
-    if ".zip" in path:
-        return ".zip"
-    if ".obj" in path:
-        return ".obj"
-    if ".glb" in path or ".gltf" in path:
-        return ".glb"
-    if ".fbx" in path:
-        return ".fbx"
-    if ".stl" in path:
-        return ".stl"
-    if ".png" in path:
-        return ".png"
-    if ".jpg" in path or ".jpeg" in path:
-        return ".jpg"
-    return default
+    ext = os.path.splitext(url.split("?", 1)[0])[1].lower()
+    return _EXT_MAP.get(ext, default)
 
 
-def download_results(
+def remote_size(url: str) -> Optional[int]:
+    """
+    Size of the object at url: Content-Length from a HEAD request, or, when HEAD is refused
+    (e.g. a URL signed for GET only), the total from the Content-Range of a one-byte ranged
+    GET. None if neither is available.
+    """
+    import requests
+    from http_session import SESSION
+
+    try:
+        r = SESSION.head(url, allow_redirects=True, timeout=(5, 30))
+        if r.ok and r.headers.get("Content-Length", "").isdigit():
+            return int(r.headers["Content-Length"])
+        headers = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
+        with SESSION.get(url, headers=headers, stream=True, timeout=(5, 30)) as r:
+            if r.status_code == 206:
+                return _content_range(r)[1]
+            if r.ok and r.headers.get("Content-Length", "").isdigit():  # Range ignored; body left unread
+                return int(r.headers["Content-Length"])
+    except requests.RequestException:
+        pass
+    return None
+
+
+def download_one(task: Tuple[str, str], **io_options) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Download one (url, out_path) task; return (size in bytes, None), or (None, error message)
+    instead of raising. io_options (chunk_size, write_buffer) are passed to download_file.
+    The body is streamed from r.raw, so a stalled stream surfaces as a urllib3 error
+    (ReadTimeoutError, DecodeError) rather than a requests one; a cut-off body is an OSError
+    from download_file's size check (urllib3 1.x does not enforce Content-Length itself).
+    """
+    import requests
+    import urllib3
+
+    url, out_path = task
+    try:
+        return download_file(url, out_path, **io_options), None
+    except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+        return None, f"❌ Failed to download {os.path.basename(out_path)}: {e}"
+
+
+def result_url(file_info) -> str:
+    """URL of one ResultFile3Ds entry (dict with Url/FileUrl, or a bare string); "" if missing."""
+    if isinstance(file_info, dict):
+        url = file_info.get("Url") or file_info.get("FileUrl") or file_info.get("url") or ""
+    else:
+        url = str(file_info)
+    return url.strip()
+
+
+def plan_downloads(
     file_list: list,
     output_dir: str,
     base_name: Optional[str] = None,
-) -> List[str]:
+) -> List[Tuple[str, str]]:
     """
-    Download result files (ResultFile3Ds) into output_dir.
+    Map result files (ResultFile3Ds) to (url, out_path) pairs, in input order.
     If base_name is set, name files: base_name.ext, base_name_2.ext, ... (sanitized).
-    Otherwise use filename from URL as before.
+    Otherwise use filename from URL; a name already planned (e.g. two CDN paths ending in
+    model.glb) gets the same _2, _3 suffix, so no two downloads ever share an output path.
+    Names depend only on position, so planning a list that only grows by appending gives every
+    earlier entry the same path again.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    downloaded: List[str] = []
+    tasks: List[Tuple[str, str]] = []
     used_names: Dict[str, int] = {}  # base no ext -> count for _2, _3
+    taken = set()  # planned filenames, lowercased for case-insensitive filesystems
 
     for i, file_info in enumerate(file_list):
-        if isinstance(file_info, dict):
-            url = file_info.get("Url") or file_info.get("FileUrl") or file_info.get("url") or ""
-        else:
-            url = str(file_info)
-        url = url.strip()
+        url = result_url(file_info)
         if not url:
             continue
 
@@ -93,9 +332,65 @@ def download_results(
         else:
             filename = os.path.basename(url.split("?")[0]) or f"model_{i+1}{ext}"
 
-        out_path = os.path.join(output_dir, filename)
-        print(f"📥 Downloading {filename}...")
-        download_file(url, out_path)
-        downloaded.append(out_path)
+        stem, file_ext = os.path.splitext(filename)
+        n = 1
+        while filename.lower() in taken:
+            n += 1
+            filename = f"{stem}_{n}{file_ext}"
+        taken.add(filename.lower())
+
+        tasks.append((url, os.path.join(output_dir, filename)))
+
+    return tasks
+
+
+def download_results(
+    file_list: list,
+    output_dir: str,
+    base_name: Optional[str] = None,
+    skip_existing: bool = False,
+    chunk_size: Optional[int] = None,
+    write_buffer: Optional[int] = None,
+) -> List[str]:
+    """
+    Download result files (ResultFile3Ds) into output_dir, named as in plan_downloads().
+    chunk_size / write_buffer override download_file's I/O sizes when given.
+    Files are fetched concurrently over the shared SESSION; the returned paths keep input order.
+    A file that fails to download is reported and left out of the result; the others still finish.
+    skip_existing keeps local files whose size matches the remote Content-Length; the HEAD
+    checks for all existing files run concurrently before any download starts.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = plan_downloads(file_list, output_dir, base_name)
+    if not tasks:
+        return []
+
+    pending = tasks
+    if skip_existing:
+        existing = [t for t in tasks if os.path.isfile(t[1])]
+        if existing:
+            with ThreadPoolExecutor(max_workers=min(_MAX_HEAD_WORKERS, len(existing))) as ex:
+                sizes = list(ex.map(lambda t: remote_size(t[0]), existing))
+            complete = {
+                out_path
+                for (_, out_path), size in zip(existing, sizes)
+                if size is not None and os.path.getsize(out_path) == size
+            }
+            if complete:
+                print(f"⏭️  Skipping {len(complete)} file(s) already downloaded")
+            pending = [t for t in tasks if t[1] not in complete]
+
+    for _, out_path in pending:
+        print(f"📥 Downloading {os.path.basename(out_path)}...")
+    failed = set()
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(pending))) as ex:
+            io_options = {k: v for k, v in (("chunk_size", chunk_size), ("write_buffer", write_buffer)) if v}
+            outcomes = list(ex.map(partial(download_one, **io_options), pending))
+        # Reported after the pool drains so worker output cannot interleave
+        for (_, out_path), (_, error) in zip(pending, outcomes):
+            if error:
+                print(error)
+                failed.add(out_path)
 
-    return downloaded
+    return [out_path for _, out_path in tasks if out_path not in failed]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Shared helpers for encoding local input files (images, 3D models) for inline API payloads.
+"""
+
+import base64
+import mmap
+import os
+
+
+def file_to_base64(path: str) -> str:
+    """
+    Base64-encode a local file. The file is memory-mapped and encoded in a single C-level
+    pass: the raw bytes are paged in from the (reclaimable) page cache instead of being
+    copied onto the heap, so private memory is only the encoded output.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""  # zero-length files cannot be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return base64.b64encode(mm).decode("ascii")
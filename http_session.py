@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide HTTP session for hy-3d downloads.
+
+One pooled requests.Session keeps TLS connections alive across downloads and retries
+transient failures (429/5xx, connection errors) with exponential backoff.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_RETRY = Retry(
+    total=5,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+)
+
+SESSION = requests.Session()
+for _prefix in ("https://", "http://"):
+    SESSION.mount(_prefix, HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_RETRY))
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Shared Tencent Cloud Hunyuan API client for hy-3d scripts.
+
+get_client() is cached per timeout, so every call site in a process shares one CommonClient
+and its keep-alive HTTPS connection: submits share one TLS session and the poll loops (which
+pass POLL_TIMEOUT) another, instead of handshaking per call. The SDK is imported on first use
+so `--help` and early validation errors stay fast.
+
+Calls that fail with RequestLimitExceeded (API throttling) are retried with jittered
+exponential backoff. Network errors are retried only for the read-only Query*/Describe*
+actions: a submit that timed out may already have been accepted, and resending it would
+create a duplicate billable job. Other API errors such as InvalidParameter still raise on the
+first attempt.
+
+query_or_none() runs one poll and turns a transient failure into "no news, poll again", so a
+short POLL_TIMEOUT never aborts a wait on a job that is still running. wait_job() waits for one
+job and poll_jobs() polls any number of jobs on that one client from a single thread; both use
+the same per-job backoff schedule.
+"""
+
+import contextvars
+import functools
+import heapq
+import itertools
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from polling import PRIME_DELAY, PRIME_POLLS, backoff_delay, equal_jitter, full_jitter
+from secrets import load_secrets
+
+# Per-request timeout in seconds; generous because submits may carry base64 images
+_REQ_TIMEOUT = 120
+# Query*Job calls are tiny: a hung poll fails fast and is retried instead of stalling the wait
+POLL_TIMEOUT = 15
+
+# StatusLine's default format; flushed on a status change, otherwise at most every
+# _FLUSH_INTERVAL seconds
+_STATUS_FMT = "\rStatus: {status:<6} | Elapsed: {m:02d}:{s:02d}"
+_FLUSH_INTERVAL = 0.5
+_SPINNER = ("⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏")
+
+_RETRY_ATTEMPTS = 5
+_RETRY_INITIAL = 1.0
+_RETRY_MAX = 30.0
+
+# Actions that only read job state, so resending one after a network error is harmless
+_IDEMPOTENT_PREFIXES = ("Query", "Describe")
+# Whether the call in flight is idempotent; set per call by the client's call_json
+_IDEMPOTENT_CALL = contextvars.ContextVar("hy3d_idempotent_call", default=False)
+
+
+def _retry_backoff(n: int) -> float:
+    """Full-jitter delay before retry n: uniform in [0, min(30, 2**n)] seconds."""
+    return full_jitter(backoff_delay(n, _RETRY_INITIAL, _RETRY_MAX, factor=2))
+
+
+def is_throttle_error(err) -> bool:
+    """True for API throttling (RequestLimitExceeded or any RequestLimitExceeded.* code)."""
+    return (err.get_code() or "").startswith("RequestLimitExceeded")
+
+
+def is_transient_error(err) -> bool:
+    """True for throttling and transport failures, worth retrying for a read-only query."""
+    return is_throttle_error(err) or err.get_code() in ("ClientNetworkError", "ServerNetworkError")
+
+
+class _ThrottleRetryer:
+    """
+    ClientProfile.retryer: the SDK wraps each call in send_request(fn).
+
+    Used instead of tencentcloud.common.retry.StandardRetryer, which never clears the previous
+    error after a failed attempt and so keeps retrying (then raises) even once a call succeeds.
+    The hook does not see the action, so _IDEMPOTENT_CALL says whether network errors may be
+    retried too.
+    """
+
+    def send_request(self, fn):
+        from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
+
+        retryable = is_transient_error if _IDEMPOTENT_CALL.get() else is_throttle_error
+        for n in range(_RETRY_ATTEMPTS):
+            try:
+                return fn()
+            except TencentCloudSDKException as e:
+                if n == _RETRY_ATTEMPTS - 1 or not retryable(e):
+                    raise
+            time.sleep(_retry_backoff(n))
+
+
+@functools.lru_cache(maxsize=1)
+def _client_class():
+    """CommonClient subclass that marks read-only actions for _ThrottleRetryer (SDK imported lazily)."""
+    from tencentcloud.common.common_client import CommonClient
+
+    class HunyuanClient(CommonClient):
+        def call_json(self, action, params, headers=None, options=None):
+            token = _IDEMPOTENT_CALL.set(action.startswith(_IDEMPOTENT_PREFIXES))
+            try:
+                return super().call_json(action, params, headers=headers, options=options)
+            finally:
+                _IDEMPOTENT_CALL.reset(token)
+
+    return HunyuanClient
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(timeout: int = _REQ_TIMEOUT):
+    """Create (once per timeout) and return the Hunyuan CommonClient configured from secrets."""
+    from tencentcloud.common import credential
+    from tencentcloud.common.profile.client_profile import ClientProfile
+    from tencentcloud.common.profile.http_profile import HttpProfile
+
+    s = load_secrets()
+    cred = credential.Credential(s.secret_id, s.secret_key)
+
+    http_profile = HttpProfile()
+    http_profile.endpoint = s.endpoint
+    http_profile.keepAlive = True
+    http_profile.reqTimeout = timeout
+
+    client_profile = ClientProfile()
+    client_profile.httpProfile = http_profile
+    client_profile.retryer = _ThrottleRetryer()
+
+    return _client_class()("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+
+
+def query_or_none(query: Callable[..., dict], *args) -> Optional[dict]:
+    """
+    Run one poll, query(*args) (e.g. client.call_json, action, params), and return its result.
+    If it still fails with a transient error (throttling, network, a POLL_TIMEOUT expiry) after
+    the client's own retries, return None: the caller keeps the last known status, sleeps and
+    polls again. Other API errors raise.
+    """
+    from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
+
+    try:
+        return query(*args)
+    except TencentCloudSDKException as err:
+        if not is_transient_error(err):
+            raise
+        return None
+
+
+def _job_delay(attempt: int, poll_seconds: float, poll_max: float, resp: dict) -> float:
+    """
+    Sleep before a job's next poll: d = poll_seconds * 1.5**attempt capped at poll_max, with
+    equal jitter (uniform in [d/2, d]). A response reporting Progress >= 90 is nearly done, so
+    the next poll comes after poll_seconds instead of a long interval.
+    """
+    progress = resp.get("Progress")
+    if isinstance(progress, (int, float)) and progress >= 90:
+        attempt = 0
+    return equal_jitter(backoff_delay(attempt, poll_seconds, poll_max))
+
+
+class StatusLine:
+    """
+    wait_job on_status that rewrites one "Status: RUN | Elapsed: 01:23" line in place; fmt may
+    also use {spin} for a spinner frame. The line is flushed on a status change, otherwise at
+    most every _FLUSH_INTERVAL seconds. elapsed holds the wait time last reported.
+    """
+
+    def __init__(self, fmt: str = _STATUS_FMT):
+        self.fmt = fmt
+        self.spinner = itertools.cycle(_SPINNER)
+        self.shown = None
+        self.flushed_at = 0.0
+        self.elapsed = 0.0
+
+    def __call__(self, status: Optional[str], resp: dict, elapsed: float) -> None:
+        self.elapsed = elapsed
+        mins, secs = divmod(int(elapsed), 60)
+        sys.stdout.write(self.fmt.format(spin=next(self.spinner), status=status or "?", m=mins, s=secs))
+        now = time.monotonic()
+        if status != self.shown or now - self.flushed_at >= _FLUSH_INTERVAL:
+            sys.stdout.flush()
+            self.shown, self.flushed_at = status, now
+
+
+def wait_job(
+    query: Callable[[str], dict],
+    job_id: str,
+    poll_seconds: float,
+    poll_max: float = 30,
+    on_status: Optional[Callable[[Optional[str], dict, float], None]] = None,
+) -> dict:
+    """
+    Poll one job until it is DONE or FAIL and return its last Response dict.
+
+    query(job_id) returns the raw Query*/Describe* result, as for poll_jobs(). The first
+    PRIME_POLLS queries come PRIME_DELAY apart so quick jobs are seen early; after that each
+    sleep is poll_jobs' backoff, growing 1.5x from poll_seconds up to poll_max (equal jitter)
+    and reset when the status changes. A query that still fails transiently keeps the last known status.
+    on_status(status, response, elapsed seconds) is called after every poll (by default a
+    StatusLine); response is the last one received, {} before the first.
+    """
+    on_status = on_status or StatusLine()
+    start = time.monotonic()
+    status = None
+    resp: dict = {}
+    attempt = 0
+    polls = 0
+    while True:
+        polls += 1
+        result = query_or_none(query, job_id)
+        if result is not None:
+            resp = result.get("Response") or {}
+            if resp.get("Status") != status:
+                attempt = 0
+            status = resp.get("Status")
+        on_status(status, resp, time.monotonic() - start)
+        if status in ("DONE", "FAIL"):
+            return resp
+        if polls <= PRIME_POLLS:
+            time.sleep(min(poll_seconds, PRIME_DELAY))
+        else:
+            time.sleep(_job_delay(attempt, poll_seconds, poll_max, resp))
+            attempt += 1
+
+
+def poll_jobs(
+    query: Callable[[str], dict],
+    job_ids: List[str],
+    poll_seconds: float,
+    poll_max: float = 30,
+) -> Dict[str, object]:
+    """
+    Poll many jobs from one thread over the shared client, each on its own schedule.
+
+    query(job_id) returns the raw Query*Job result (e.g. a partial of client.call_json). Every
+    job has a due time and its own backoff (growing 1.5x from poll_seconds up to poll_max with
+    equal jitter, reset when its status changes), and the loop always queries the earliest-due
+    job, so the query rate is bounded per job rather than growing with the number of jobs.
+    A query that still fails after the client's own retries with a transient error keeps the
+    job's last status. Status changes are printed as "[n/N] job_id: STATUS".
+    Returns {job_id: ResultFile3Ds list, or an "ErrorCode - ErrorMessage" string if it failed}.
+    """
+    index = {job_id: n for n, job_id in enumerate(job_ids, 1)}
+    status = dict.fromkeys(job_ids)
+    attempt = dict.fromkeys(job_ids, 0)
+    last: Dict[str, dict] = dict.fromkeys(job_ids, {})  # latest Response per job
+    due = [(time.monotonic(), job_id) for job_id in job_ids]  # heap of (due_at, job_id)
+    heapq.heapify(due)
+    outcome: Dict[str, object] = {}
+    while due:
+        due_at, job_id = heapq.heappop(due)
+        wait = due_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        result = query_or_none(query, job_id)
+        if result is not None:
+            resp = last[job_id] = result.get("Response") or {}
+            if resp.get("Status") != status[job_id]:
+                status[job_id] = resp.get("Status")
+                attempt[job_id] = 0
+                print(f"   [{index[job_id]}/{len(job_ids)}] {job_id}: {status[job_id]}")
+            if status[job_id] == "DONE":
+                outcome[job_id] = resp.get("ResultFile3Ds") or []
+                continue
+            if status[job_id] == "FAIL":
+                outcome[job_id] = f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}"
+                continue
+        delay = _job_delay(attempt[job_id], poll_seconds, poll_max, last[job_id])
+        attempt[job_id] += 1
+        heapq.heappush(due, (time.monotonic() + delay, job_id))
+    return outcome
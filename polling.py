@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Shared helpers for polling asynchronous Hunyuan 3D jobs.
+
+Delays grow exponentially from a short initial interval up to a cap, so fast jobs are
+detected quickly while long jobs do not issue a query every few seconds.
+"""
+
+import random
+
+_MAX_EXPONENT = 64  # keeps factor ** attempt finite for very long waits
+
+# Right after a submit the job usually reports WAIT almost at once; the first few queries use
+# a short fixed delay so jobs that finish quickly (small inputs, cached results) are seen early.
+PRIME_POLLS = 2
+PRIME_DELAY = 0.5
+
+
+def backoff_delay(attempt: int, initial: float, maximum: float, factor: float = 1.5) -> float:
+    """Seconds to sleep before the next poll: initial * factor**attempt, capped at maximum."""
+    attempt = max(0, min(attempt, _MAX_EXPONENT))
+    return min(maximum, initial * (factor ** attempt))
+
+
+def full_jitter(delay: float) -> float:
+    """Uniform random sleep in [0, delay], so many clients backing off do not poll in lockstep."""
+    return random.uniform(0, delay)
+
+
+def equal_jitter(delay: float) -> float:
+    """Uniform random sleep in [delay / 2, delay]: spread out like full_jitter, but never near 0."""
+    return delay / 2 + random.uniform(0, delay / 2)
@@ -2,35 +2,54 @@
 import argparse
 import json
 import os
+import re
 import sys
 import time
-import urllib.request
 
-from tencentcloud.common.common_client import CommonClient
-from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
 
-from secrets import load_secrets
+from download_utils import download_results
+from hy3d_client import POLL_TIMEOUT, get_client, wait_job
 
+_JOB_ID_RE = re.compile(r"[A-Za-z0-9_-]+")
 
-def get_client():
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
+# Finished jobs never change, so their Describe responses are kept on disk and re-runs of
+# the same JobId skip the API. Entries expire because the result URLs are presigned.
+_CACHE_PATH = os.path.expanduser("~/.hy3d_cache/jobs.json")
+_CACHE_MAX_AGE = 3600
 
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
 
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
-
-
-def download_file(url: str, output_path: str) -> None:
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    urllib.request.urlretrieve(url, output_path)
+def _load_cache() -> dict:
+    try:
+        with open(_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_result(key: str, max_age: float = _CACHE_MAX_AGE):
+    """Return the cached DONE response for key, or None if missing or stale."""
+    entry = _load_cache().get(key)
+    if entry and entry.get("status") == "DONE" and time.time() - entry.get("ts", 0) < max_age:
+        return entry.get("result")
+    return None
+
+
+def store_result(key: str, result: dict) -> None:
+    """Persist a DONE response; cache write failures are never fatal."""
+    db = _load_cache()
+    db[key] = {"status": "DONE", "result": result, "ts": time.time()}
+    # Drop expired entries so the file does not grow without bound
+    now = time.time()
+    db = {k: v for k, v in db.items() if now - v.get("ts", 0) < _CACHE_MAX_AGE}
+    try:
+        os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+        tmp = f"{_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(db, f)
+        os.replace(tmp, _CACHE_PATH)
+    except OSError:
+        pass
 
 
 def main():
@@ -59,19 +78,21 @@ Examples:
         help="Job type: hunyuan (default), smart-topology, texture-edit, part, or rapid"
     )
     parser.add_argument("--wait", action="store_true", help="Wait until job is DONE/FAIL")
-    parser.add_argument("--poll", type=int, default=10, help="Polling interval seconds (default: 10)")
+    parser.add_argument("--poll", type=float, default=2, help="Initial polling interval in seconds; backs off 1.5x per poll (default: 2)")
+    parser.add_argument("--poll-max", type=float, default=20, help="Maximum polling interval in seconds (default: 20)")
     parser.add_argument("--download", action="store_true", help="Download ResultFile3Ds once DONE")
     parser.add_argument("--output", "-o", default="./hunyuan_output_query", help="Output directory for downloads")
+    parser.add_argument("--no-cache", action="store_true", help="Always query the API instead of reusing a cached DONE response")
     args = parser.parse_args()
 
     job_id = (args.job_id or "").strip()
     if not job_id:
         print("❌ job_id is required.", file=sys.stderr)
         sys.exit(1)
-    if not job_id.replace("-", "").replace("_", "").isalnum():
+    if not _JOB_ID_RE.fullmatch(job_id):
         print("⚠️  Warning: JobId usually looks like a numeric string (e.g. 1375367755519696896). Check if correct.", file=sys.stderr)
 
-    client = get_client()
+    client = get_client(POLL_TIMEOUT)
     params = {"JobId": job_id}
 
     # Determine which API to use based on job type
@@ -86,45 +107,45 @@ Examples:
     else:
         api_action = "QueryHunyuanTo3DProJob"
 
+    cache_key = f"{api_action}:{job_id}"
+    # Only this process could add the entry mid-wait, and only after seeing DONE: read it once
+    result = None if args.no_cache else cached_result(cache_key)
+    cached = result is not None
     try:
-        while True:
-            result = client.call_json(api_action, params)
-            resp = result.get("Response", {})
-            status = resp.get("Status")
+        if not cached:
+            if args.wait:
+                # Same schedule and status line as the submit scripts; a transient failure is a missed poll
+                resp = wait_job(
+                    lambda job_id: client.call_json(api_action, {"JobId": job_id}),
+                    job_id,
+                    args.poll,
+                    args.poll_max,
+                )
+                print()
+                result = {"Response": resp}
+            else:
+                result = client.call_json(api_action, params)
+        resp = result.get("Response", {})
+        status = resp.get("Status")
+        if not args.wait or cached:
             print(f"Status: {status}")
 
-            if status in ("DONE", "FAIL"):
-                print(json.dumps(result, indent=2))
-
-            if status == "DONE":
-                if args.download:
-                    files = resp.get("ResultFile3Ds", []) or []
-                    os.makedirs(args.output, exist_ok=True)
-                    for i, file_info in enumerate(files):
-                        if isinstance(file_info, dict):
-                            url = file_info.get("Url") or file_info.get("FileUrl") or file_info.get("url") or ""
-                        else:
-                            url = str(file_info)
-                        url = url.strip()
-                        if not url:
-                            continue
-                        url_path = url.split("?")[0]
-                        filename = os.path.basename(url_path) or f"model_{i+1}.glb"
-                        out_path = os.path.join(args.output, filename)
-                        print(f"📥 Downloading {filename}...")
-                        download_file(url, out_path)
-                    print(f"✅ Downloaded to: {os.path.abspath(args.output)}")
-                break
-
-            if status == "FAIL":
-                error_code = resp.get("ErrorCode") or resp.get("Error", {}).get("Code", "Unknown")
-                error_msg = resp.get("ErrorMessage") or resp.get("Error", {}).get("Message", "Unknown error")
-                raise SystemExit(f"Job failed: {error_code} - {error_msg}")
-
-            if not args.wait:
-                break
-
-            time.sleep(args.poll)
+        if status in ("DONE", "FAIL"):
+            print(json.dumps(result, indent=2))
+
+        if status == "DONE":
+            if not cached:
+                store_result(cache_key, result)
+            if args.download:
+                files = resp.get("ResultFile3Ds", []) or []
+                # Same JobId means same results: files kept from an earlier run are reused
+                download_results(files, args.output, skip_existing=True)
+                print(f"✅ Downloaded to: {os.path.abspath(args.output)}")
+
+        if status == "FAIL":
+            error_code = resp.get("ErrorCode") or resp.get("Error", {}).get("Code", "Unknown")
+            error_msg = resp.get("ErrorMessage") or resp.get("Error", {}).get("Message", "Unknown error")
+            raise SystemExit(f"Job failed: {error_code} - {error_msg}")
 
     except TencentCloudSDKException as err:
         raise SystemExit(f"API Error: {err}") from err
@@ -1,3 +1,4 @@
+import functools
 import json
 import os
 from dataclasses import dataclass
@@ -13,6 +14,8 @@ class Hy3DSecrets:
     endpoint: str = "hunyuan.intl.tencentcloudapi.com"
     cos_bucket: Optional[str] = None  # e.g. "mybucket-1234567890" for local-file upload to COS
     cos_region: Optional[str] = None  # COS region, defaults to region if not set
+    cos_part_size_mb: int = 5  # multipart part size for COS uploads; smaller files use a single PUT
+    cos_concurrency: int = 10  # parallel part uploads per file
 
 
 def _default_secrets_paths() -> list[Path]:
@@ -26,9 +29,10 @@ def _default_secrets_paths() -> list[Path]:
     ]
 
 
+@functools.lru_cache(maxsize=1)
 def load_secrets() -> Hy3DSecrets:
     """
-    Load secrets from a local JSON file.
+    Load secrets from a local JSON file. The result is cached for the process lifetime.
 
     Supported locations (first found wins):
       - $HY3D_SECRETS_PATH
@@ -57,6 +61,10 @@ def load_secrets() -> Hy3DSecrets:
                     raise ValueError(f"Missing secret_id/secret_key in {p}")
                 cos_bucket = (data.get("cos_bucket") or "").strip() or None
                 cos_region = (data.get("cos_region") or "").strip() or None
+                cos_part_size_mb = int(data.get("cos_part_size_mb") or 5)
+                cos_concurrency = int(data.get("cos_concurrency") or 10)
+                if cos_part_size_mb < 1 or cos_concurrency < 1:
+                    raise ValueError(f"cos_part_size_mb and cos_concurrency must be >= 1 in {p}")
                 return Hy3DSecrets(
                     secret_id=secret_id,
                     secret_key=secret_key,
@@ -64,6 +72,8 @@ def load_secrets() -> Hy3DSecrets:
                     endpoint=endpoint,
                     cos_bucket=cos_bucket,
                     cos_region=cos_region,
+                    cos_part_size_mb=cos_part_size_mb,
+                    cos_concurrency=cos_concurrency,
                 )
         except json.JSONDecodeError as e:
             raise RuntimeError(f"Failed to parse secrets JSON in {p}: {e}") from e
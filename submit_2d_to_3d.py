@@ -4,134 +4,283 @@
 Tencent Hunyuan 3D Generator (2D image -> 3D model)
 
 Usage:
-  python3 submit_2d_to_3d.py <image_path> [options]
+  python3 submit_2d_to_3d.py <image_path> [<image_path> ...] [options]
+
+Several images are submitted and polled concurrently on one asyncio event loop.
 """
 
-import argparse
-import base64
+import asyncio
 import os
+import stat
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 try:
-    from tencentcloud.common.common_client import CommonClient
-    from tencentcloud.common import credential
     from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-    from tencentcloud.common.profile.client_profile import ClientProfile
-    from tencentcloud.common.profile.http_profile import HttpProfile
 except ImportError:
     print("❌ Tencent Cloud SDK not installed!")
     print("   Run: pip install tencentcloud-sdk-python")
     sys.exit(1)
 
+from cos_upload import resolve_input_to_url
+from download_utils import MAX_DOWNLOAD_WORKERS, download_one, plan_downloads, remote_size, result_url, unique_base_names
+from encode_utils import file_to_base64
+from hy3d_client import POLL_TIMEOUT, StatusLine, get_client, wait_job
 from secrets import load_secrets
 
-from download_utils import download_results
-
+# Polling interval bounds for hy3d_client.wait_job (initial and maximum seconds)
+_POLL_BASE = 2
+_POLL_MAX = 20
 
-def image_to_base64(image_path):
-    """Convert local image file to base64"""
-    with open(image_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+_STATUS_FMT = "\r   {spin} Status: {status:<6} | Elapsed: {m:02d}:{s:02d}"
 
 
-def get_client():
-    """Create and return API client"""
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-    
-    httpProfile = HttpProfile()
-    httpProfile.endpoint = s.endpoint
-    
-    clientProfile = ClientProfile()
-    clientProfile.httpProfile = httpProfile
-    
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=clientProfile)
+def image_input(image_path, upload_via_cos=False, field="Image"):
+    """
+    API field for one image: {field}Url after a COS upload, or inline {field}Base64.
+    The URL form keeps the ~33% larger base64 payload out of the request body.
+    """
+    if upload_via_cos:
+        return {f"{field}Url": resolve_input_to_url(image_path, subfolder="2d")}
+    return {f"{field}Base64": file_to_base64(image_path)}
 
 
-def submit_job(params):
+def submit_job(params, label=None):
     """Submit the 3D generation job"""
-    print("\n⏳ Submitting job...")
+    print(f"\n⏳ Submitting job{f' for {label}' if label else ''}...")
     
     client = get_client()
     result = client.call_json("SubmitHunyuanTo3DProJob", params)
     
-    job_id = result.get("Response", {}).get("JobId")
+    response = result.get("Response") or {}
+    job_id = response.get("JobId")
     
     if job_id:
         print(f"✅ Job submitted successfully!")
         print(f"   Job ID: {job_id}")
         return job_id
     else:
-        error = result.get("Response", {}).get("Error", {})
+        error = response.get("Error") or {}
         print(f"❌ Submission failed!")
         print(f"   Error: {error.get('Code', 'Unknown')} - {error.get('Message', str(result))}")
         return None
 
 
-def wait_for_completion(job_id):
-    """Poll for job completion with progress display"""
-    print("\n⏱️  Waiting for 3D generation (typically 2-5 minutes)...")
-    print("-" * 50)
+async def wait_for_completion_async(job_id, poll_seconds=_POLL_BASE, label=None, on_files=None):
+    """
+    Poll for job completion without blocking the event loop.
+
+    hy3d_client.wait_job runs in a worker thread, so many jobs can be polled concurrently.
+    With a label (several jobs at once) a line is printed per status change instead of
+    the single-job spinner. on_files, if given, is called on the event loop with any
+    ResultFile3Ds a WAIT/RUN response already lists, so downloads can start before the job is DONE.
+    """
+    if not label:
+        print("\n⏱️  Waiting for 3D generation (typically 2-5 minutes)...")
+        print("-" * 50)
     
-    client = get_client()
-    params = {"JobId": job_id}
+    loop = asyncio.get_running_loop()
+    client = get_client(POLL_TIMEOUT)
+    prefix = f"[{label}] " if label else ""
+    status_line = StatusLine(_STATUS_FMT)
+    shown = [None]
+
+    def show(status, response, elapsed):
+        if label:
+            status_line.elapsed = elapsed
+            if status != shown[0]:
+                mins, secs = divmod(int(elapsed), 60)
+                print(f"   {prefix}Status: {status or '?':<6} | Elapsed: {mins:02d}:{secs:02d}")
+                shown[0] = status
+        else:
+            status_line(status, response, elapsed)
+        if on_files and status not in ("DONE", "FAIL") and response.get("ResultFile3Ds"):
+            loop.call_soon_threadsafe(on_files, response["ResultFile3Ds"])
+
+    response = await asyncio.to_thread(
+        wait_job,
+        lambda job_id: client.call_json("QueryHunyuanTo3DProJob", {"JobId": job_id}),
+        job_id,
+        poll_seconds,
+        _POLL_MAX,
+        show,
+    )
+    mins, secs = divmod(int(status_line.elapsed), 60)
+
+    if response.get("Status") == "FAIL":
+        error_code = response.get("ErrorCode", "Unknown")
+        error_msg = response.get("ErrorMessage", "Unknown error")
+        print(f"\n\n❌ {prefix}Generation failed!")
+        print(f"   Error: {error_code} - {error_msg}")
+        return None
+    print(f"\n\n🎉 {prefix}SUCCESS! 3D model generated in {mins}m {secs}s")
+    return response.get("ResultFile3Ds", [])
+
+
+class _ResultPrefetcher:
+    """
+    Starts a download for each result file as soon as a poll first lists it.
+
+    Files are keyed by URL without its query string (signatures change between polls) and
+    named by plan_downloads() in first-seen order, so a job that only lists files at DONE
+    gets exactly the names download_results() would give them.
+
+    A file listed while the job is still WAIT/RUN may not be final yet, so finish() checks each
+    such download against the size the server reports for the DONE listing's URL (same object
+    key, fresh signature) and fetches it again if they differ or the early download failed.
+    If the size cannot be read at all the early file is kept: its key has not changed.
+    """
+
+    def __init__(self, output_dir, base_name):
+        self.output_dir = output_dir
+        self.base_name = base_name
+        self.files = []
+        self.latest = {}  # key -> URL from the most recent listing
+        self.tasks = []  # (key, out_path, asyncio.Task, started before DONE) in plan order
+
+    def add(self, file_list, done=False):
+        for file_info in file_list:
+            url = result_url(file_info)
+            key = url.split("?", 1)[0]
+            if not key:
+                continue
+            if key not in self.latest:
+                self.files.append(file_info)
+            self.latest[key] = url
+        plan = plan_downloads(self.files, self.output_dir, base_name=self.base_name)
+        for url, out_path in plan[len(self.tasks):]:
+            print(f"📥 Downloading {os.path.basename(out_path)}...")
+            task = asyncio.create_task(asyncio.to_thread(download_one, (url, out_path)))
+            self.tasks.append((url.split("?", 1)[0], out_path, task, not done))
+
+    async def _settle(self, key, out_path, task, early, recheck):
+        """
+        Outcome of one download. With recheck, a file started before DONE is downloaded again
+        from its DONE URL if it failed or the server now reports a different size.
+        """
+        size, error = outcome = await task
+        if not (early and recheck):
+            return outcome
+        url = self.latest[key]
+        if error is None:
+            current = await asyncio.to_thread(remote_size, url)
+            if current is None or current == size:
+                return outcome
+        print(f"🔄 Re-downloading {os.path.basename(out_path)} (listed before the job finished)...")
+        return await asyncio.to_thread(download_one, (url, out_path))
+
+    async def finish(self, done=True):
+        """
+        Wait for every started download; return (path, size in bytes) pairs in plan order.
+        done says the job reached DONE, so files started before it are rechecked.
+        """
+        outcomes = await asyncio.gather(*(self._settle(*entry, recheck=done) for entry in self.tasks))
+        downloaded = []
+        for (_, out_path, _, _), (size, error) in zip(self.tasks, outcomes):
+            if error:
+                print(error)
+            else:
+                downloaded.append((out_path, size))
+        return downloaded
+
+
+async def process_image(image_path, base_params, output_dir, label=None, upload_via_cos=False, base_name=None):
+    """
+    Submit, wait for and download the job for one image; return (path, size) pairs or None.
+    Output files are named after base_name (default: the image's filename stem).
+    """
+    print(f"\n📸 Loading image: {image_path}")
+    params = {**await asyncio.to_thread(image_input, image_path, upload_via_cos), **base_params}
     
-    start_time = time.time()
-    poll_count = 0
+    job_id = await asyncio.to_thread(submit_job, params, label)
+    if not job_id:
+        return None
     
-    while True:
-        poll_count += 1
-        result = client.call_json("QueryHunyuanTo3DProJob", params)
-        response = result.get("Response", {})
-        status = response.get("Status")
-        
-        elapsed = int(time.time() - start_time)
-        mins, secs = divmod(elapsed, 60)
-        
-        # Progress display
-        spinner = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"][poll_count % 10]
-        print(f"\r   {spinner} Status: {status:<6} | Elapsed: {mins:02d}:{secs:02d}", end="", flush=True)
-        
-        if status == "DONE":
-            print(f"\n\n🎉 SUCCESS! 3D model generated in {mins}m {secs}s")
-            return response.get("ResultFile3Ds", [])
-            
-        elif status == "FAIL":
-            error_code = response.get("ErrorCode", "Unknown")
-            error_msg = response.get("ErrorMessage", "Unknown error")
-            print(f"\n\n❌ Generation failed!")
-            print(f"   Error: {error_code} - {error_msg}")
-            return None
-            
-        else:  # WAIT or RUN
-            time.sleep(5)
+    # Download results (title from source image filename); files listed early start downloading
+    # while the job is still running.
+    image_base_name = base_name or os.path.splitext(os.path.basename(image_path))[0]
+    prefetch = _ResultPrefetcher(output_dir, image_base_name)
+    results = await wait_for_completion_async(job_id, label=label, on_files=prefetch.add)
+    if not results:
+        await prefetch.finish(done=False)
+        return None
+    
+    print(f"\n📥 Downloading 3D model files{f' for {label}' if label else ''}...")
+    print("-" * 50)
+    prefetch.add(results, done=True)
+    return await prefetch.finish()
+
+
+def _output_names(image_paths):
+    """
+    (label, base_name) per image. Images whose filenames repeat (a/chair.png, b/chair.png) are
+    labelled by their path and get distinct base names (download_utils.unique_base_names), so
+    concurrent jobs never write the same output files.
+    """
+    basenames = [os.path.basename(p) for p in image_paths]
+    if len(image_paths) == 1:
+        labels = [None]
+    else:
+        labels = [p if basenames.count(b) > 1 else b for p, b in zip(image_paths, basenames)]
+    return list(zip(labels, unique_base_names([os.path.splitext(b)[0] for b in basenames])))
+
+
+async def _process_or_report(image_path, base_params, output_dir, label, upload_via_cos, base_name):
+    """
+    process_image() for one of several concurrent images: a failure (API error, COS upload,
+    unreadable file) is reported for that image and returns None, so the other jobs, already
+    submitted and billed, still finish and download.
+    """
+    prefix = f"[{label}] " if label else ""
+    try:
+        return await process_image(image_path, base_params, output_dir, label, upload_via_cos, base_name)
+    except TencentCloudSDKException as e:
+        print(f"\n❌ {prefix}API Error: {e}")
+    except (RuntimeError, OSError) as e:
+        print(f"\n❌ {prefix}Error: {e}")
+    return None
+
+
+async def main_async(image_paths, base_params, output_dir, upload_via_cos=False):
+    """Run one submit → wait → download pipeline per image concurrently."""
+    # Each waiting job holds a worker thread for its whole wait; leave room for submits and downloads
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=len(image_paths) + MAX_DOWNLOAD_WORKERS)
+    )
+    return await asyncio.gather(*(
+        _process_or_report(p, base_params, output_dir, label, upload_via_cos, base_name)
+        for p, (label, base_name) in zip(image_paths, _output_names(image_paths))
+    ))
 
 
 def print_summary(downloaded_files, output_dir):
-    """Print final summary"""
+    """
+    Print final summary (output_dir is expected to be absolute already). downloaded_files holds
+    (path, size) pairs with the byte counts recorded while downloading, so nothing is stat'ed.
+    """
     print("\n" + "=" * 50)
     print("  📦 DOWNLOAD COMPLETE")
     print("=" * 50)
     
-    print(f"\n📁 Output directory: {os.path.abspath(output_dir)}")
+    print(f"\n📁 Output directory: {output_dir}")
     print(f"\n📄 Downloaded files:")
     
-    for f in downloaded_files:
-        size_mb = os.path.getsize(f) / (1024 * 1024)
-        print(f"   • {os.path.basename(f)} ({size_mb:.1f} MB)")
+    for f, size in downloaded_files:
+        print(f"   • {os.path.basename(f)} ({size / (1024 * 1024):.1f} MB)")
     
     print("\n" + "-" * 50)
     print("EN IN BLENDER:")
     print("   1. Open Blender")
     print("   2. File → Import → Wavefront (.obj) or glTF (.glb)")
-    print(f"   3. Navigate to: {os.path.abspath(output_dir)}")
+    print(f"   3. Navigate to: {output_dir}")
     print("   4. Select the file and click Import")
     print("   5. Press Z → Material Preview to see textures")
     print("-" * 50)
 
 
 def main():
+    import argparse  # only the CLI needs it; keeps import-as-library cheap
+
     # Parse command line arguments
     parser = argparse.ArgumentParser(
         description="Convert 2D images to 3D models using Tencent Hunyuan API",
@@ -139,15 +288,18 @@ def main():
         epilog="""
 Examples:
   python3 submit_2d_to_3d.py photo.png
+  python3 submit_2d_to_3d.py chair.png table.png lamp.webp
   python3 submit_2d_to_3d.py photo.png --faces 800000 --pbr
   python3 submit_2d_to_3d.py sketch.png --type Sketch
   python3 submit_2d_to_3d.py car.jpg --type LowPoly --polygon quad
+  python3 submit_2d_to_3d.py photo.png --upload-via-cos
         """
     )
     
     parser.add_argument(
         "image",
-        help="Path to input image (JPG, PNG, JPEG, WEBP)"
+        nargs="+",
+        help="Path to input image (JPG, PNG, JPEG, WEBP). Several images run as concurrent jobs."
     )
     
     parser.add_argument(
@@ -198,35 +350,50 @@ Examples:
         help="Path to back view image (optional)"
     )
     
+    parser.add_argument(
+        "--upload-via-cos",
+        action="store_true",
+        help="Upload images to Tencent COS and send ImageUrl instead of inline base64 (requires cos_bucket)"
+    )
+    
     args = parser.parse_args()
+    args.output = os.path.abspath(args.output)
     
     # Print header
     print("\n" + "=" * 50)
     print("  🎨 TENCENT HUNYUAN 3D GENERATOR")
     print("=" * 50)
     
-    # Validate input image
-    if not os.path.exists(args.image):
-        print(f"\n❌ Image file not found: {args.image}", file=sys.stderr)
-        sys.exit(1)
+    # Validate input images
     allowed_ext = (".jpg", ".jpeg", ".png", ".webp")
-    if os.path.splitext(args.image)[1].lower() not in allowed_ext:
-        print(f"\n⚠️  Warning: API supports JPG, PNG, JPEG, WEBP. Your file may not be accepted.", file=sys.stderr)
-    try:
-        size_mb = os.path.getsize(args.image) / (1024 * 1024)
+    for image_path in args.image:
+        # One stat covers existence, file type and size
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            print(f"\n❌ Image file not found: {image_path}", file=sys.stderr)
+            sys.exit(1)
+        if not stat.S_ISREG(st.st_mode):
+            print(f"\n❌ Not a regular file: {image_path}", file=sys.stderr)
+            sys.exit(1)
+        if os.path.splitext(image_path)[1].lower() not in allowed_ext:
+            print(f"\n⚠️  Warning: API supports JPG, PNG, JPEG, WEBP. {image_path} may not be accepted.", file=sys.stderr)
+        size_mb = st.st_size / (1024 * 1024)
         if size_mb > 6:
-            print(f"\n⚠️  Warning: Image is {size_mb:.1f} MB. API recommends ≤6 MB (encoding adds ~30%%).", file=sys.stderr)
-    except OSError:
-        pass
+            print(f"\n⚠️  Warning: {image_path} is {size_mb:.1f} MB. API recommends ≤6 MB (encoding adds ~30%%).", file=sys.stderr)
+    if len(args.image) > 1 and (args.left or args.right or args.back):
+        print("\n❌ --left/--right/--back can only be used with a single input image.", file=sys.stderr)
+        sys.exit(1)
+    if args.upload_via_cos and not load_secrets().cos_bucket:
+        print("\n❌ --upload-via-cos requires cos_bucket (and optional cos_region) in your secrets file.", file=sys.stderr)
+        sys.exit(1)
     # Validate face count
     if not 40000 <= args.faces <= 1500000:
         print(f"\n❌ Face count must be between 40,000 and 1,500,000 (Pro API limit). Got {args.faces}.", file=sys.stderr)
         sys.exit(1)
     
-    # Build API parameters
-    print(f"\n📸 Loading image: {args.image}")
-    params = {
-        "ImageBase64": image_to_base64(args.image),
+    # Build API parameters shared by every image
+    base_params = {
         "GenerateType": args.type,
         "FaceCount": args.faces,
         "EnablePBR": args.pbr
@@ -234,23 +401,28 @@ Examples:
     
     # Add polygon type for LowPoly mode
     if args.type == "LowPoly":
-        params["PolygonType"] = "quadrilateral" if args.polygon == "quad" else "triangle"
+        base_params["PolygonType"] = "quadrilateral" if args.polygon == "quad" else "triangle"
     
-    # Add multi-view images if provided
+    # Add multi-view images if provided (encoded or uploaded concurrently)
+    views = [(t, p) for t, p in [("left", args.left), ("right", args.right), ("back", args.back)] if p]
+    for view_type, view_path in views:
+        if not os.path.exists(view_path):
+            print(f"\n❌ {view_type} view image not found: {view_path}")
+            sys.exit(1)
+        print(f"📸 Loading {view_type} view: {view_path}")
     multi_views = []
-    for view_type, view_path in [("left", args.left), ("right", args.right), ("back", args.back)]:
-        if view_path:
-            if not os.path.exists(view_path):
-                print(f"\n❌ {view_type} view image not found: {view_path}")
-                sys.exit(1)
-            print(f"📸 Loading {view_type} view: {view_path}")
-            multi_views.append({
-                "ViewType": view_type,
-                "ViewImageBase64": image_to_base64(view_path)
-            })
+    if views:
+        with ThreadPoolExecutor(max_workers=len(views)) as pool:
+            inputs = pool.map(
+                lambda p: image_input(p, args.upload_via_cos, field="ViewImage"), [p for _, p in views]
+            )
+            multi_views = [
+                {"ViewType": view_type, **image_field}
+                for (view_type, _), image_field in zip(views, inputs)
+            ]
     
     if multi_views:
-        params["MultiViewImages"] = multi_views
+        base_params["MultiViewImages"] = multi_views
     
     # Print settings
     print("\n⚙️  Settings:")
@@ -261,29 +433,22 @@ Examples:
         print(f"   • Polygon: {args.polygon}")
     if multi_views:
         print(f"   • Extra views: {', '.join(v['ViewType'] for v in multi_views)}")
+    if len(args.image) > 1:
+        print(f"   • Images: {len(args.image)} (submitted concurrently)")
+    if args.upload_via_cos:
+        print("   • Input: COS URL")
     
     try:
-        # Submit job
-        job_id = submit_job(params)
-        if not job_id:
-            sys.exit(1)
-
-        # Wait for completion
-        results = wait_for_completion(job_id)
-        if not results:
-            sys.exit(1)
-
-        # Download results (title from source image filename)
-        image_base_name = os.path.splitext(os.path.basename(args.image))[0]
-        print("\n📥 Downloading 3D model files...")
-        print("-" * 50)
-        downloaded = download_results(results, args.output, base_name=image_base_name)
+        outcomes = asyncio.run(main_async(args.image, base_params, args.output, args.upload_via_cos))
+        downloaded = [f for files in outcomes if files for f in files]
 
         if downloaded:
             print_summary(downloaded, args.output)
         else:
             print("\n❌ No files were downloaded")
             sys.exit(1)
+        if not all(outcomes):
+            sys.exit(1)
 
     except TencentCloudSDKException as e:
         print(f"\n❌ API Error: {e}")
@@ -6,35 +6,15 @@ Uses SubmitHunyuan3DPartJob and QueryHunyuan3DPartJob.
 Input: FBX only, ≤30k faces, ≤100MB recommended. Local files (--file) are uploaded via cos_upload (Tencent COS public-read).
 """
 
-import argparse
 import json
 import os
 import sys
-import time
 
-from tencentcloud.common.common_client import CommonClient
-from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
-
-from secrets import load_secrets
 
 from cos_upload import resolve_input_to_url
 from download_utils import download_results
-
-
-def get_client():
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
-
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+from hy3d_client import POLL_TIMEOUT, get_client, wait_job
 
 
 def submit_part_job(*, file_url: str, file_type: str = "FBX") -> str:
@@ -43,34 +23,29 @@ def submit_part_job(*, file_url: str, file_type: str = "FBX") -> str:
     params = {"File": file3d}
     client = get_client()
     result = client.call_json("SubmitHunyuan3DPartJob", params)
-    job_id = result.get("Response", {}).get("JobId")
+    job_id = (result.get("Response") or {}).get("JobId")
     if not job_id:
         raise RuntimeError(f"Submit failed: {json.dumps(result, indent=2)}")
     return job_id
 
 
-def wait_for_completion(job_id: str, poll_seconds: int) -> list:
-    client = get_client()
-    params = {"JobId": job_id}
-
-    start_time = time.time()
-    while True:
-        result = client.call_json("QueryHunyuan3DPartJob", params)
-        resp = result.get("Response", {})
-        status = resp.get("Status")
-
-        elapsed = int(time.time() - start_time)
-        mins, secs = divmod(elapsed, 60)
-        print(f"\rStatus: {status:<6} | Elapsed: {mins:02d}:{secs:02d}", end="", flush=True)
-
-        if status == "DONE":
-            print("\n✅ Job completed!")
-            return resp.get("ResultFile3Ds", []) or []
-        if status == "FAIL":
-            print("\n❌ Job failed!")
-            raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
-
-        time.sleep(poll_seconds)
+def wait_for_completion(job_id: str, poll_seconds: float, poll_max: float = 20) -> list:
+    """
+    Wait with hy3d_client.wait_job (status line, backoff from poll_seconds up to poll_max) and
+    return the ResultFile3Ds; raise RuntimeError if the job fails.
+    """
+    client = get_client(POLL_TIMEOUT)
+    resp = wait_job(
+        lambda job_id: client.call_json("QueryHunyuan3DPartJob", {"JobId": job_id}),
+        job_id,
+        poll_seconds,
+        poll_max,
+    )
+    if resp.get("Status") == "FAIL":
+        print("\n❌ Job failed!")
+        raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
+    print("\n✅ Job completed!")
+    return resp.get("ResultFile3Ds") or []
 
 
 def detect_file_type(path_or_url: str) -> str:
@@ -80,6 +55,8 @@ def detect_file_type(path_or_url: str) -> str:
 
 
 def main():
+    import argparse  # only the CLI needs it; keeps import-as-library cheap
+
     parser = argparse.ArgumentParser(
         description="Submit a Hunyuan 3D Part job (3D model → component identification/generation), wait for completion, and download results.",
         epilog="""
@@ -97,7 +74,8 @@ Examples:
     parser.add_argument("--url", "-u", help="URL of input 3D file (FBX; valid 24h). Cannot be used with --file.")
     parser.add_argument("--file", "-f", help="Path to local FBX file (uploaded via cos_upload; requires cos_bucket in secrets). Cannot be used with --url.")
     parser.add_argument("--type", "-t", choices=["FBX"], default=None, help="Input file format (API supports FBX only; default: FBX)")
-    parser.add_argument("--poll", type=int, default=10, help="Polling interval in seconds (default: 10)")
+    parser.add_argument("--poll", type=float, default=2, help="Initial polling interval in seconds; backs off 1.5x per poll (default: 2)")
+    parser.add_argument("--poll-max", type=float, default=20, help="Maximum polling interval in seconds (default: 20)")
     parser.add_argument("--output", "-o", default="./hunyuan_output_part", help="Output directory (default: ./hunyuan_output_part)")
     args = parser.parse_args()
 
@@ -126,7 +104,7 @@ Examples:
     try:
         job_id = submit_part_job(file_url=file_url_arg, file_type=file_type)
         print(f"✅ Submitted. JobId: {job_id}")
-        results = wait_for_completion(job_id, poll_seconds=args.poll)
+        results = wait_for_completion(job_id, poll_seconds=args.poll, poll_max=args.poll_max)
         base_name = None
         if has_file:
             base_name = os.path.splitext(os.path.basename(args.file))[0]
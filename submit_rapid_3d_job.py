@@ -3,38 +3,29 @@
 Submit a Hunyuan 3D Rapid job (text or image → 3D), wait for completion, and download results.
 
 Uses SubmitHunyuanTo3DRapidJob and QueryHunyuanTo3DRapidJob.
-Either --prompt, --image, or --image-url is required.
+Either --prompt, --image, or --image-url is required, or --batch FILE to run many jobs at once.
 """
 
 import argparse
-import base64
 import json
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from tencentcloud.common.common_client import CommonClient
-from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
 
-from secrets import load_secrets
+from download_utils import download_results, parse_size, unique_base_names
+from encode_utils import file_to_base64
+from hy3d_client import POLL_TIMEOUT, get_client, poll_jobs, wait_job
 
-from download_utils import download_results
+# Last query result per JobId as (fetched_at monotonic seconds, result), shared by all pollers
+_STATUS_CACHE: dict[str, tuple[float, dict]] = {}
+_STATUS_LOCK = threading.Lock()
 
-
-def get_client():
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
-
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+_IMG_EXTS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+_FMT_CHOICES = ("OBJ", "GLB", "STL", "USDZ", "FBX", "MP4", "GIF")
 
 
 def submit_rapid_job(
@@ -72,28 +63,147 @@ def submit_rapid_job(
     return job_id
 
 
-def wait_for_completion(job_id: str, poll_seconds: int) -> list:
-    client = get_client()
-    params = {"JobId": job_id}
+def query_rapid_job(job_id: str, ttl: float = 0) -> dict:
+    """
+    QueryHunyuanTo3DRapidJob for one job. With ttl > 0, a result fetched by any caller in this
+    process less than ttl seconds ago is reused instead of issuing another query; the fetch
+    time is stamped after the call returns, so a reused result is never older than ttl.
+    A job's entry is dropped once it reports DONE or FAIL. ttl=0 (default) always queries and
+    leaves the cache alone.
+    """
+    if ttl <= 0:
+        return get_client(POLL_TIMEOUT).call_json("QueryHunyuanTo3DRapidJob", {"JobId": job_id})
+    with _STATUS_LOCK:
+        hit = _STATUS_CACHE.get(job_id)
+    if hit and time.monotonic() - hit[0] < ttl:
+        return hit[1]
+    result = get_client(POLL_TIMEOUT).call_json("QueryHunyuanTo3DRapidJob", {"JobId": job_id})
+    with _STATUS_LOCK:
+        if (result.get("Response") or {}).get("Status") in ("DONE", "FAIL"):
+            _STATUS_CACHE.pop(job_id, None)
+        else:
+            _STATUS_CACHE[job_id] = (time.monotonic(), result)
+    return result
+
+
+def wait_for_completion(job_id: str, poll_seconds: float, poll_max: float = 30, status_ttl: float = 0) -> list:
+    """
+    Wait with hy3d_client.wait_job (status line, backoff from poll_seconds up to poll_max) and
+    return the ResultFile3Ds; raise RuntimeError if the job fails.
+    status_ttl is passed to query_rapid_job for callers that watch the same job concurrently.
+    """
+    resp = wait_job(lambda job_id: query_rapid_job(job_id, ttl=status_ttl), job_id, poll_seconds, poll_max)
+    if resp.get("Status") == "FAIL":
+        print("\n❌ Job failed!")
+        raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
+    print("\n✅ Job completed!")
+    return resp.get("ResultFile3Ds") or []
 
-    start_time = time.time()
-    while True:
-        result = client.call_json("QueryHunyuanTo3DRapidJob", params)
-        resp = result.get("Response", {})
-        status = resp.get("Status")
 
-        elapsed = int(time.time() - start_time)
-        mins, secs = divmod(elapsed, 60)
-        print(f"\rStatus: {status:<6} | Elapsed: {mins:02d}:{secs:02d}", end="", flush=True)
+def export_title(prompt: str | None, image: str | None, image_url: str | None) -> str:
+    """Title for result files: the prompt that generated them, or the source image filename/URL basename."""
+    if prompt:
+        return prompt
+    if image:
+        return os.path.splitext(os.path.basename(image))[0]
+    if image_url:
+        return os.path.splitext(os.path.basename(image_url.split("?")[0]))[0] or "model"
+    return "model"
+
+
+def load_batch(path: str) -> list[dict]:
+    """
+    Read batch inputs: one job per line. A line is either a JSON object with one of
+    "prompt", "image" (local path) or "image_url", or plain text used as the prompt.
+    Blank lines and lines starting with # are skipped.
+    """
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as err:
+                    raise ValueError(f"{path}:{lineno}: invalid JSON: {err}") from err
+                if not isinstance(entry, dict):
+                    raise ValueError(f"{path}:{lineno}: expected a JSON object")
+            else:
+                entry = {"prompt": line}
+            inputs = [k for k in ("prompt", "image", "image_url") if entry.get(k)]
+            if len(inputs) != 1:
+                raise ValueError(f"{path}:{lineno}: need exactly one of prompt, image, image_url")
+            if entry.get("image"):
+                if not os.path.isfile(entry["image"]):
+                    raise ValueError(f"{path}:{lineno}: image file not found: {entry['image']}")
+                if os.path.splitext(entry["image"])[1].lower() not in _IMG_EXTS:
+                    print(f"⚠️  Warning: {path}:{lineno}: API supports JPG, PNG, JPEG, WEBP.", file=sys.stderr)
+            entries.append(entry)
+    return entries
+
 
-        if status == "DONE":
-            print("\n✅ Job completed!")
-            return resp.get("ResultFile3Ds", []) or []
-        if status == "FAIL":
-            print("\n❌ Job failed!")
-            raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
+def poll_many(job_ids: list[str], poll_seconds: float, poll_max: float = 30, status_ttl: float = 0) -> dict:
+    """
+    Poll many Rapid jobs from one thread with hy3d_client.poll_jobs (per-job due times and
+    jittered backoff, as in wait_for_completion).
+    Returns {job_id: ResultFile3Ds list, or the error message string for failed jobs}.
+    """
+    return poll_jobs(lambda job_id: query_rapid_job(job_id, ttl=status_ttl), job_ids, poll_seconds, poll_max)
 
-        time.sleep(poll_seconds)
+
+def run_batch(args) -> None:
+    """Submit every --batch entry concurrently, poll them together, then download each result."""
+    entries = load_batch(args.batch)
+    if not entries:
+        raise SystemExit(f"No jobs in {args.batch}")
+
+    def submit(entry: dict) -> str | Exception:
+        try:
+            image_base64 = file_to_base64(entry["image"]) if entry.get("image") else None
+            return submit_rapid_job(
+                prompt=entry.get("prompt"),
+                image_base64=image_base64,
+                image_url=entry.get("image_url"),
+                result_format=args.format,
+                enable_pbr=args.pbr,
+                enable_geometry=args.geometry,
+            )
+        except (TencentCloudSDKException, RuntimeError, OSError) as err:
+            return err
+
+    print(f"Submitting {len(entries)} job(s) with concurrency {args.concurrency}...")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        submitted = list(pool.map(submit, entries))
+    # Same prompt, same 120-char prefix or same image name from another folder: -2, -3 keep
+    # each job's files apart in the shared output directory
+    titles = unique_base_names([export_title(e.get("prompt"), e.get("image"), e.get("image_url")) for e in entries])
+    for title, job_id in zip(titles, submitted):
+        if isinstance(job_id, Exception):
+            print(f"❌ Submit failed for {title}: {job_id}")
+        else:
+            print(f"✅ Submitted. JobId: {job_id} ({title})")
+
+    job_ids = [j for j in submitted if isinstance(j, str)]
+    outcome = poll_many(job_ids, poll_seconds=args.poll, poll_max=args.poll_max, status_ttl=args.status_ttl)
+
+    for title, job_id in zip(titles, submitted):
+        if isinstance(job_id, Exception):
+            continue
+        results = outcome[job_id]
+        if isinstance(results, list):
+            downloaded = download_results(
+                results, args.output, base_name=title,
+                chunk_size=args.io_chunksize, write_buffer=args.write_buffer,
+            )
+            print(f"✅ {job_id}: downloaded {len(downloaded)} file(s)")
+        elif isinstance(results, str):
+            print(f"❌ {job_id} failed: {results}")
+    succeeded = sum(isinstance(r, list) for r in outcome.values())
+    print(f"Done: {succeeded}/{len(entries)} job(s) succeeded. Output: {os.path.abspath(args.output)}")
+    if succeeded < len(entries):
+        sys.exit(1)
 
 
 def main():
@@ -108,6 +218,9 @@ Examples:
   # Image to 3D
   python3 submit_rapid_3d_job.py --image photo.png
   python3 submit_rapid_3d_job.py --image-url "https://example.com/photo.jpg" -o ./rapid_out
+
+  # Many jobs at once (one prompt or JSON object per line)
+  python3 submit_rapid_3d_job.py --batch prompts.jsonl --concurrency 4 --format GLB
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
@@ -116,16 +229,53 @@ Examples:
     parser.add_argument("--image-url", help="URL of input image (image-to-3D). Cannot be used with --prompt/--image.")
     parser.add_argument(
         "--format", "-f",
-        choices=["OBJ", "GLB", "STL", "USDZ", "FBX", "MP4", "GIF"],
+        choices=_FMT_CHOICES,
         default="STL",
         help="Output 3D file format (default: STL). USDZ/MP4/GIF may timeout for large models.",
     )
     parser.add_argument("--pbr", action="store_true", help="Enable PBR material generation")
     parser.add_argument("--geometry", action="store_true", help="Generate geometry only (white model, no textures); output GLB")
-    parser.add_argument("--poll", type=int, default=10, help="Polling interval in seconds (default: 10)")
+    parser.add_argument("--poll", type=float, default=2, help="Initial polling interval in seconds (default: 2)")
+    parser.add_argument("--poll-max", type=float, default=30, help="Maximum polling interval in seconds (default: 30)")
+    parser.add_argument(
+        "--status-ttl",
+        type=float,
+        default=0,
+        help="Reuse a job status fetched in this process less than this many seconds ago (default: 0, always query)",
+    )
     parser.add_argument("--output", "-o", default="./hunyuan_output_rapid", help="Output directory (default: ./hunyuan_output_rapid)")
+    parser.add_argument(
+        "--io-chunksize",
+        type=parse_size,
+        default=None,
+        help="Download read size, e.g. 8MB (default: 1MiB). Increasing may raise throughput where network exceeds disk-write speed.",
+    )
+    parser.add_argument(
+        "--write-buffer",
+        type=parse_size,
+        default=None,
+        help="Download file write buffer, e.g. 1MB (default: Python's 8KiB; reads larger than it bypass the buffer).",
+    )
+    parser.add_argument(
+        "--batch",
+        help='File with one job per line: a prompt, or JSON like {"image": "a.png"} / {"image_url": "..."}',
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel submissions in --batch mode (default: 4)")
     args = parser.parse_args()
 
+    if args.batch:
+        if args.prompt or args.image or args.image_url:
+            parser.error("--batch cannot be combined with --prompt, --image or --image-url")
+        if args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+        try:
+            run_batch(args)
+        except (ValueError, OSError) as err:
+            raise SystemExit(f"Batch error: {err}") from err
+        except TencentCloudSDKException as err:
+            raise SystemExit(f"API Error: {err}") from err
+        return
+
     # Require exactly one input: prompt, image file, or image URL
     has_prompt = bool((args.prompt or "").strip())
     has_image = bool(args.image)
@@ -149,11 +299,12 @@ Examples:
         if not os.path.exists(args.image):
             print(f"❌ Image file not found: {args.image}", file=sys.stderr)
             sys.exit(1)
-        if os.path.splitext(args.image)[1].lower() not in (".jpg", ".jpeg", ".png", ".webp"):
+        if os.path.splitext(args.image)[1].lower() not in _IMG_EXTS:
             print("⚠️  Warning: API supports JPG, PNG, JPEG, WEBP.", file=sys.stderr)
-        with open(args.image, "rb") as f:
-            image_base64_arg = base64.b64encode(f.read()).decode("utf-8")
+        image_base64_arg = file_to_base64(args.image)
     image_url_arg = (args.image_url or "").strip() if has_image_url else None
+    # Title for result files: prompt that generated it, or source image filename/URL basename
+    title = export_title(prompt_arg, args.image, image_url_arg)
 
     try:
         job_id = submit_rapid_job(
@@ -165,17 +316,13 @@ Examples:
             enable_geometry=args.geometry,
         )
         print(f"✅ Submitted. JobId: {job_id}")
-        results = wait_for_completion(job_id, poll_seconds=args.poll)
-        # Title: prompt that generated it, or source image filename/URL basename
-        if prompt_arg:
-            export_title = prompt_arg
-        elif args.image:
-            export_title = os.path.splitext(os.path.basename(args.image))[0]
-        elif image_url_arg:
-            export_title = os.path.splitext(os.path.basename(image_url_arg.split("?")[0]))[0] or "model"
-        else:
-            export_title = "model"
-        downloaded = download_results(results, args.output, base_name=export_title)
+        results = wait_for_completion(
+            job_id, poll_seconds=args.poll, poll_max=args.poll_max, status_ttl=args.status_ttl
+        )
+        downloaded = download_results(
+            results, args.output, base_name=title,
+            chunk_size=args.io_chunksize, write_buffer=args.write_buffer,
+        )
         print(f"✅ Downloaded {len(downloaded)} file(s) to: {os.path.abspath(args.output)}")
         if downloaded:
             print("Files:")
@@ -13,25 +13,23 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import base64
+import functools
 import hashlib
 import hmac
 import json
 import os
 import sys
 import time
-import urllib.request
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Optional
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
 
 try:
-    from tencentcloud.common.common_client import CommonClient
-    from tencentcloud.common import credential
+    import orjson  # optional: much faster than json.dumps on large base64 Content
+except ImportError:
+    orjson = None
+
+try:
     from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-    from tencentcloud.common.profile.client_profile import ClientProfile
-    from tencentcloud.common.profile.http_profile import HttpProfile
 except ImportError:
     print("❌ Tencent Cloud SDK not installed!")
     print("   Run: pip install tencentcloud-sdk-python")
@@ -39,30 +37,49 @@ except ImportError:
 
 from secrets import Hy3DSecrets, load_secrets
 
+from cos_upload import resolve_input_to_url
+from download_utils import MAX_DOWNLOAD_WORKERS, download_one, plan_downloads
+from encode_utils import file_to_base64
+from hy3d_client import POLL_TIMEOUT, StatusLine, get_client, wait_job
+
+_STATUS_FMT = "\r   {spin} Status: {status:<6} | Elapsed: {m:02d}:{s:02d}"
+
+# With --upload-via-cos, files up to this size are still sent inline (a COS round trip costs more)
+_INLINE_MAX_BYTES = 5 * 1024 * 1024
 
 
+def _hmac_sha256(key: bytes, msg: str) -> bytes:
+    return hmac.digest(key, msg.encode("utf-8"), "sha256")
+
+
+@functools.lru_cache(maxsize=8)
+def _signing_key(secret_key: str, date: str, service: str) -> bytes:
+    """TC3 derived signing key; depends only on (key, UTC date, service), so it is cached."""
+    secret_date = _hmac_sha256(f"TC3{secret_key}".encode("utf-8"), date)
+    secret_service = _hmac_sha256(secret_date, service)
+    return _hmac_sha256(secret_service, "tc3_request")
 
 
 def sign_request(
     secrets: Hy3DSecrets,
     action: str,
-    payload: dict,
+    payload_bytes: bytes,
     timestamp: int
 ) -> Dict[str, str]:
     """
     Generate Tencent Cloud API v3 signature and return headers.
+    payload_bytes is the exact request body, so it is serialized once and shared with the POST.
     """
     service = "hunyuan"
     host = secrets.endpoint
     algorithm = "TC3-HMAC-SHA256"
-    date = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+    date = time.strftime("%Y-%m-%d", time.gmtime(timestamp))
     
     # Canonical request
     http_method = "POST"
     canonical_uri = "/"
     canonical_querystring = ""
     content_type = "application/json"
-    payload_json = json.dumps(payload)
     signed_headers = "content-type;host;x-tc-action"
     
     canonical_headers = (
@@ -71,7 +88,7 @@ def sign_request(
         f"x-tc-action:{action.lower()}\n"
     )
     
-    hashed_payload = hashlib.sha256(payload_json.encode("utf-8")).hexdigest()
+    hashed_payload = hashlib.sha256(payload_bytes).hexdigest()
     
     canonical_request = (
         f"{http_method}\n"
@@ -93,13 +110,8 @@ def sign_request(
     )
     
     # Signature
-    def hmac_sha256(key: bytes, msg: str) -> bytes:
-        return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
-    
-    secret_date = hmac_sha256(f"TC3{secrets.secret_key}".encode("utf-8"), date)
-    secret_service = hmac_sha256(secret_date, service)
-    secret_signing = hmac_sha256(secret_service, "tc3_request")
-    signature = hmac.new(secret_signing, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    secret_signing = _signing_key(secrets.secret_key, date, service)
+    signature = hmac.digest(secret_signing, string_to_sign.encode("utf-8"), "sha256").hex()
     
     # Authorization header
     authorization = (
@@ -141,14 +153,15 @@ def submit_smart_topology_job(
     Returns:
         API response as dict
     """
+    import requests  # deferred: requests is slow to import and --help never needs it
+    from http_session import SESSION
+
     action = "Submit3DSmartTopologyJob"
 
     file3d: Dict[str, str] = {"Type": file_type.upper()}
 
     if is_local:
-        with open(file_ref, "rb") as f:
-            file_bytes = f.read()
-        file3d["Content"] = base64.b64encode(file_bytes).decode("utf-8")
+        file3d["Content"] = file_to_base64(file_ref)
     else:
         file3d["Url"] = file_ref
 
@@ -159,77 +172,63 @@ def submit_smart_topology_job(
     if face_level:
         payload["FaceLevel"] = face_level
     
-    timestamp = int(datetime.now(timezone.utc).timestamp())
-    headers = sign_request(secrets, action, payload, timestamp)
+    # Serialized once (compact) and used both for the signature hash and as the body
+    if orjson is not None:
+        payload_bytes = orjson.dumps(payload)
+    else:
+        payload_bytes = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    timestamp = int(time.time())
+    headers = sign_request(secrets, action, payload_bytes, timestamp)
     
     url = f"https://{secrets.endpoint}"
-    payload_bytes = json.dumps(payload).encode("utf-8")
-    
-    request = Request(url, data=payload_bytes, headers=headers, method="POST")
     
+    # Pooled keep-alive session shared with downloads (connection errors are retried;
+    # POST is never re-sent after the server has seen it)
     try:
-        with urlopen(request, timeout=30) as response:
-            return json.loads(response.read().decode("utf-8"))
-    except HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        raise RuntimeError(f"API request failed ({e.code}): {error_body}") from e
-    except URLError as e:
-        raise RuntimeError(f"Network error: {e.reason}") from e
+        response = SESSION.post(url, data=payload_bytes, headers=headers, timeout=(5, 30))
+    except requests.RequestException as e:
+        raise RuntimeError(f"Network error: {e}") from e
+    if not response.ok:
+        raise RuntimeError(f"API request failed ({response.status_code}): {response.text}")
+    return response.json()
 
 
-def detect_file_type(url: str) -> str:
-    """Detect file type from URL extension."""
-    url_lower = url.lower()
-    if url_lower.endswith(".glb"):
-        return "GLB"
-    elif url_lower.endswith(".gltf"):
-        return "GLTF"
-    elif url_lower.endswith(".obj"):
-        return "OBJ"
-    elif url_lower.endswith(".fbx"):
-        return "FBX"
-    elif url_lower.endswith(".stl"):
-        return "STL"
-    else:
-        return "GLB"  # Default
+_EXT_MAP = {".glb": "GLB", ".gltf": "GLTF", ".obj": "OBJ", ".fbx": "FBX", ".stl": "STL"}
 
 
-def get_client():
-    """Create and return API client using SDK."""
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-    
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
-    
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-    
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+def detect_file_type(url: str) -> str:
+    """Detect file type from URL extension (query string ignored; defaults to GLB)."""
+    ext = os.path.splitext(url.split("?", 1)[0])[1].lower()
+    return _EXT_MAP.get(ext, "GLB")
 
 
-def describe_smart_topology_job(job_id: str) -> dict:
+def describe_smart_topology_job(job_id: str, client=None) -> dict:
     """
     Query a 3D Smart Topology job status using Describe3DSmartTopologyJob.
     
     Args:
         job_id: The job ID returned by Submit3DSmartTopologyJob
+        client: CommonClient to reuse (defaults to the shared keep-alive client)
     
     Returns:
         API response as dict
     """
-    client = get_client()
+    client = client or get_client(POLL_TIMEOUT)
     params = {"JobId": job_id}
     return client.call_json("Describe3DSmartTopologyJob", params)
 
 
-def wait_for_completion(job_id: str, poll_seconds: int = 10) -> Optional[dict]:
+def wait_for_completion(job_id: str, poll_seconds: float = 2, poll_max: float = 20) -> Optional[dict]:
     """
     Poll for job completion with progress display.
     
+    Polling is hy3d_client.wait_job's schedule: a few quick queries, then a jittered interval
+    starting at poll_seconds that grows 1.5x per unchanged status up to poll_max.
+    
     Args:
         job_id: The job ID to query
-        poll_seconds: Polling interval in seconds
+        poll_seconds: Initial polling interval in seconds
+        poll_max: Maximum polling interval in seconds
     
     Returns:
         Job response dict if successful, None if failed
@@ -237,51 +236,24 @@ def wait_for_completion(job_id: str, poll_seconds: int = 10) -> Optional[dict]:
     print("\n⏱️  Waiting for topology optimization (this may take several minutes)...")
     print("-" * 50)
     
-    start_time = time.time()
-    poll_count = 0
+    client = get_client(POLL_TIMEOUT)
+    status_line = StatusLine(_STATUS_FMT)
+    response = wait_job(
+        lambda job_id: describe_smart_topology_job(job_id, client), job_id, poll_seconds, poll_max, status_line
+    )
+    mins, secs = divmod(int(status_line.elapsed), 60)
     
-    while True:
-        poll_count += 1
-        result = describe_smart_topology_job(job_id)
-        response = result.get("Response", {})
-        status = response.get("Status")
-        
-        elapsed = int(time.time() - start_time)
-        mins, secs = divmod(elapsed, 60)
-        
-        # Progress display
-        spinner = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"][poll_count % 10]
-        print(f"\r   {spinner} Status: {status:<6} | Elapsed: {mins:02d}:{secs:02d}", end="", flush=True)
-        
-        if status == "DONE":
-            print(f"\n\n🎉 SUCCESS! Topology optimization completed in {mins}m {secs}s")
-            return response
-            
-        elif status == "FAIL":
-            error_code = response.get("ErrorCode", "Unknown")
-            error_msg = response.get("ErrorMessage", "Unknown error")
-            print(f"\n\n❌ Optimization failed!")
-            print(f"   Error: {error_code} - {error_msg}")
-            return None
-            
-        else:  # WAIT or RUN
-            time.sleep(poll_seconds)
-
-
-def download_file(url: str, output_path: str) -> bool:
-    """Download a file from URL."""
-    try:
-        print(f"   Downloading {os.path.basename(output_path)}...", end=" ", flush=True)
-        urllib.request.urlretrieve(url, output_path)
-        size_mb = os.path.getsize(output_path) / (1024 * 1024)
-        print(f"✅ ({size_mb:.1f} MB)")
-        return True
-    except Exception as e:
-        print(f"❌ Failed: {e}")
-        return False
+    if response.get("Status") == "FAIL":
+        error_code = response.get("ErrorCode", "Unknown")
+        error_msg = response.get("ErrorMessage", "Unknown error")
+        print(f"\n\n❌ Optimization failed!")
+        print(f"   Error: {error_code} - {error_msg}")
+        return None
+    print(f"\n\n🎉 SUCCESS! Topology optimization completed in {mins}m {secs}s")
+    return response
 
 
-def download_results(file_list: list, output_dir: str) -> list[str]:
+def download_results(file_list: list, output_dir: str) -> list[tuple[str, int]]:
     """
     Download all result files from the job response.
     
@@ -290,41 +262,32 @@ def download_results(file_list: list, output_dir: str) -> list[str]:
         output_dir: Directory to save files
     
     Returns:
-        List of downloaded file paths
+        (path, size_bytes) for each downloaded file, in input order
+    
+    Files are named and fetched by download_utils (plan_downloads / download_one), concurrently
+    over the shared pooled session; each file's result is printed as soon as it finishes.
     """
     print("\n📥 Downloading optimized 3D model files...")
     print("-" * 50)
     
     os.makedirs(output_dir, exist_ok=True)
-    downloaded_files = []
-    
-    for i, file_info in enumerate(file_list):
-        # Handle different response formats
-        if isinstance(file_info, dict):
-            url = file_info.get("Url") or file_info.get("FileUrl") or file_info.get("url", "")
-            file_type = file_info.get("Type", file_info.get("type", ""))
-        else:
-            url = str(file_info)
-            file_type = ""
-        
-        if not url:
-            print(f"   ⚠️  Skipping empty URL for file #{i+1}")
-            continue
-        
-        # Extract filename from URL or generate one
-        url_path = url.split("?")[0]  # Remove query params
-        filename = os.path.basename(url_path)
-        
-        if not filename or filename == "":
-            ext = ".obj" if "obj" in url.lower() else ".glb"
-            filename = f"optimized_model_{i+1}{ext}"
-        
-        output_path = os.path.join(output_dir, filename)
-        
-        if download_file(url, output_path):
-            downloaded_files.append(output_path)
+    tasks = plan_downloads(file_list, output_dir)
+    if not tasks:
+        return []
+    
+    sizes = {}
+    with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(tasks))) as ex:
+        futures = {ex.submit(download_one, task): task[1] for task in tasks}
+        for future in as_completed(futures):
+            output_path = futures[future]
+            size, error = future.result()
+            if error is None:
+                print(f"   Downloaded {os.path.basename(output_path)} ✅ ({size / (1024 * 1024):.1f} MB)")
+                sizes[output_path] = size
+            else:
+                print(f"   {error}")
     
-    return downloaded_files
+    return [(output_path, sizes[output_path]) for _, output_path in tasks if output_path in sizes]
 
 
 def main():
@@ -340,6 +303,7 @@ Examples:
   # Local file
   %(prog)s ./models/model.glb --local
   %(prog)s ./models/model.obj --local --file-type OBJ --face-level medium
+  %(prog)s ./models/big_model.glb --upload-via-cos   # upload to COS, submit by URL
 
   # Wait for completion and download results
   %(prog)s ./model.glb --wait --download --output ./optimized_models
@@ -393,6 +357,12 @@ Examples:
         help="Treat file_ref as a local file path and upload content directly instead of using a URL",
     )
     
+    parser.add_argument(
+        "--upload-via-cos",
+        action="store_true",
+        help="Upload a local file (> 5 MB) to Tencent COS and submit its URL instead of inline base64 (requires cos_bucket)",
+    )
+    
     parser.add_argument(
         "--wait",
         action="store_true",
@@ -401,9 +371,16 @@ Examples:
     
     parser.add_argument(
         "--poll",
-        type=int,
-        default=10,
-        help="Polling interval in seconds when --wait is used (default: 10)",
+        type=float,
+        default=2,
+        help="Initial polling interval in seconds when --wait is used; backs off 1.5x per poll (default: 2)",
+    )
+    
+    parser.add_argument(
+        "--poll-max",
+        type=float,
+        default=20,
+        help="Maximum polling interval in seconds when --wait is used (default: 20)",
     )
     
     parser.add_argument(
@@ -442,9 +419,18 @@ Examples:
     if not is_local and not (file_ref.startswith("http://") or file_ref.startswith("https://")):
         print("⚠️  Warning: file_ref does not look like a URL (http(s)://). Remote requests may fail.", file=sys.stderr)
 
-    # Detect file type if not specified
+    # Detect file type if not specified (before a COS upload replaces the path with a URL)
     file_type = args.file_type or detect_file_type(file_ref)
     
+    if is_local and args.upload_via_cos:
+        if not secrets.cos_bucket:
+            print("❌ --upload-via-cos requires cos_bucket (and optional cos_region) in your secrets file.", file=sys.stderr)
+            sys.exit(1)
+        if os.path.getsize(file_ref) > _INLINE_MAX_BYTES:
+            # Multipart, parallel upload (cos_part_size_mb / cos_concurrency); skipped if unchanged
+            file_ref = resolve_input_to_url(file_ref, subfolder="smart_topology")
+            is_local = False
+    
     if not args.json:
         print(f"Submitting job...")
         print(f"  Source: {file_ref}")
@@ -479,7 +465,7 @@ Examples:
                     
                     # Wait for completion if requested
                     if args.wait:
-                        job_response = wait_for_completion(job_id, poll_seconds=args.poll)
+                        job_response = wait_for_completion(job_id, poll_seconds=args.poll, poll_max=args.poll_max)
                         
                         if job_response and args.download:
                             # Download results
@@ -492,9 +478,8 @@ Examples:
                                     print("=" * 50)
                                     print(f"\n📁 Output directory: {os.path.abspath(args.output)}")
                                     print(f"\n📄 Downloaded files:")
-                                    for f in downloaded:
-                                        size_mb = os.path.getsize(f) / (1024 * 1024)
-                                        print(f"   • {os.path.basename(f)} ({size_mb:.1f} MB)")
+                                    for f, size in downloaded:
+                                        print(f"   • {os.path.basename(f)} ({size / (1024 * 1024):.1f} MB)")
                                     print("\n" + "-" * 50)
                             else:
                                 print("\n⚠️  No result files found in job response")
@@ -8,31 +8,16 @@ Output: redrawn texture files (e.g. OBJ, FBX, IMAGE) in ResultFile3Ds.
 """
 
 import argparse
-import base64
 import json
 import os
 import sys
-import time
 
-from tencentcloud.common.common_client import CommonClient
-from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
 
-from secrets import load_secrets
 from cos_upload import resolve_input_to_url
 from download_utils import download_results
-
-
-def get_client():
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+from encode_utils import file_to_base64
+from hy3d_client import POLL_TIMEOUT, get_client, wait_job
 
 
 def submit_texture_edit_job(
@@ -72,24 +57,23 @@ def submit_texture_edit_job(
     return job_id
 
 
-def wait_for_completion(job_id: str, poll_seconds: int) -> list:
-    client = get_client()
-    params = {"JobId": job_id}
-    start_time = time.time()
-    while True:
-        result = client.call_json("QueryHunyuanTo3DTextureEditJob", params)
-        resp = result.get("Response", {})
-        status = resp.get("Status")
-        elapsed = int(time.time() - start_time)
-        mins, secs = divmod(elapsed, 60)
-        print(f"\rStatus: {status:<6} | Elapsed: {mins:02d}:{secs:02d}", end="", flush=True)
-        if status == "DONE":
-            print("\n✅ Job completed!")
-            return resp.get("ResultFile3Ds", []) or []
-        if status == "FAIL":
-            print("\n❌ Job failed!")
-            raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
-        time.sleep(poll_seconds)
+def wait_for_completion(job_id: str, poll_seconds: float, poll_max: float = 20) -> list:
+    """
+    Wait with hy3d_client.wait_job (status line, backoff from poll_seconds up to poll_max) and
+    return the ResultFile3Ds; raise RuntimeError if the job fails.
+    """
+    client = get_client(POLL_TIMEOUT)
+    resp = wait_job(
+        lambda job_id: client.call_json("QueryHunyuanTo3DTextureEditJob", {"JobId": job_id}),
+        job_id,
+        poll_seconds,
+        poll_max,
+    )
+    if resp.get("Status") == "FAIL":
+        print("\n❌ Job failed!")
+        raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
+    print("\n✅ Job completed!")
+    return resp.get("ResultFile3Ds") or []
 
 
 def main():
@@ -133,7 +117,8 @@ Examples:
         action="store_true",
         help="Enable PBR texture (only when using --prompt).",
     )
-    parser.add_argument("--poll", type=int, default=10, help="Polling interval in seconds (default: 10)")
+    parser.add_argument("--poll", type=float, default=2, help="Initial polling interval in seconds; backs off 1.5x per poll (default: 2)")
+    parser.add_argument("--poll-max", type=float, default=20, help="Maximum polling interval in seconds (default: 20)")
     parser.add_argument(
         "--output", "-o",
         default="./hunyuan_output_texture_edit",
@@ -147,7 +132,7 @@ Examples:
     if not model_ref.startswith("http") and not os.path.exists(model_ref):
         print(f"❌ Model path not found: {model_ref}", file=sys.stderr)
         sys.exit(1)
-    if not model_ref.lower().split("?")[0].endswith(".fbx"):
+    if os.path.splitext(model_ref.split("?", 1)[0])[1].lower() != ".fbx":
         print("⚠️  Warning: Texture Edit API expects FBX format, <100,000 faces recommended.", file=sys.stderr)
 
     has_prompt = bool((args.prompt or "").strip())
@@ -177,8 +162,7 @@ Examples:
         ext = os.path.splitext(args.image)[1].lower()
         if ext not in (".jpg", ".jpeg", ".png"):
             print("⚠️  Warning: Reference image should be JPG or PNG, 128–4096 px, Base64 <10 MB.", file=sys.stderr)
-        with open(args.image, "rb") as f:
-            image_base64_arg = base64.b64encode(f.read()).decode("utf-8")
+        image_base64_arg = file_to_base64(args.image)
     image_url_arg = (args.image_url or "").strip() if has_image_url else None
 
     # Base name for downloaded files: prompt or model/image name
@@ -198,7 +182,7 @@ Examples:
             enable_pbr=args.pbr,
         )
         print(f"✅ Submitted. JobId: {job_id}")
-        results = wait_for_completion(job_id, poll_seconds=args.poll)
+        results = wait_for_completion(job_id, poll_seconds=args.poll, poll_max=args.poll_max)
         downloaded = download_results(results, args.output, base_name=export_title)
         print(f"✅ Downloaded {len(downloaded)} file(s) to: {os.path.abspath(args.output)}")
         if downloaded:
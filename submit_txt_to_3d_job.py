@@ -3,30 +3,11 @@ import argparse
 import json
 import os
 import sys
-import time
 
-from tencentcloud.common.common_client import CommonClient
-from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
-
-from secrets import load_secrets
 
 from download_utils import download_results
-
-
-def get_client():
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
-
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+from hy3d_client import POLL_TIMEOUT, get_client, wait_job
 
 
 def submit_text_to_3d(prompt: str, face_count: int, generate_type: str) -> str:
@@ -39,28 +20,23 @@ def submit_text_to_3d(prompt: str, face_count: int, generate_type: str) -> str:
     return job_id
 
 
-def wait_for_completion(job_id: str, poll_seconds: int) -> list:
-    client = get_client()
-    params = {"JobId": job_id}
-
-    start_time = time.time()
-    while True:
-        result = client.call_json("QueryHunyuanTo3DProJob", params)
-        resp = result.get("Response", {})
-        status = resp.get("Status")
-
-        elapsed = int(time.time() - start_time)
-        mins, secs = divmod(elapsed, 60)
-        print(f"\rStatus: {status:<6} | Elapsed: {mins:02d}:{secs:02d}", end="", flush=True)
-
-        if status == "DONE":
-            print("\n✅ Job completed!")
-            return resp.get("ResultFile3Ds", []) or []
-        if status == "FAIL":
-            print("\n❌ Job failed!")
-            raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
-
-        time.sleep(poll_seconds)
+def wait_for_completion(job_id: str, poll_seconds: float, poll_max: float = 20) -> list:
+    """
+    Wait with hy3d_client.wait_job (status line, backoff from poll_seconds up to poll_max) and
+    return the ResultFile3Ds; raise RuntimeError if the job fails.
+    """
+    client = get_client(POLL_TIMEOUT)
+    resp = wait_job(
+        lambda job_id: client.call_json("QueryHunyuanTo3DProJob", {"JobId": job_id}),
+        job_id,
+        poll_seconds,
+        poll_max,
+    )
+    if resp.get("Status") == "FAIL":
+        print("\n❌ Job failed!")
+        raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
+    print("\n✅ Job completed!")
+    return resp.get("ResultFile3Ds") or []
 
 
 def main():
@@ -80,7 +56,8 @@ def main():
         default="Normal",
         help="Generate type (default: Normal)",
     )
-    parser.add_argument("--poll", type=int, default=10, help="Polling interval in seconds (default: 10)")
+    parser.add_argument("--poll", type=float, default=2, help="Initial polling interval in seconds; backs off 1.5x per poll (default: 2)")
+    parser.add_argument("--poll-max", type=float, default=20, help="Maximum polling interval in seconds (default: 20)")
     parser.add_argument("--output", "-o", default="./hunyuan_output_txt", help="Output directory (default: ./hunyuan_output_txt)")
     args = parser.parse_args()
 
@@ -104,7 +81,7 @@ def main():
     try:
         job_id = submit_text_to_3d(prompt=prompt, face_count=args.faces, generate_type=args.type)
         print(f"✅ Submitted. JobId: {job_id}")
-        results = wait_for_completion(job_id, poll_seconds=args.poll)
+        results = wait_for_completion(job_id, poll_seconds=args.poll, poll_max=args.poll_max)
         downloaded = download_results(results, args.output, base_name=prompt)
         print(f"✅ Downloaded {len(downloaded)} file(s) to: {os.path.abspath(args.output)}")
         if downloaded:
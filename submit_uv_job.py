@@ -10,31 +10,12 @@ import argparse
 import json
 import os
 import sys
-import time
 
-from tencentcloud.common.common_client import CommonClient
-from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
-
-from secrets import load_secrets
 
 from cos_upload import resolve_input_to_url
 from download_utils import download_results
-
-
-def get_client():
-    s = load_secrets()
-    cred = credential.Credential(s.secret_id, s.secret_key)
-
-    http_profile = HttpProfile()
-    http_profile.endpoint = s.endpoint
-
-    client_profile = ClientProfile()
-    client_profile.httpProfile = http_profile
-
-    return CommonClient("hunyuan", "2023-09-01", cred, s.region, profile=client_profile)
+from hy3d_client import POLL_TIMEOUT, get_client, poll_jobs, wait_job
 
 
 def submit_uv_job(*, file_url: str, file_type: str) -> str:
@@ -49,40 +30,47 @@ def submit_uv_job(*, file_url: str, file_type: str) -> str:
     return job_id
 
 
-def wait_for_completion(job_id: str, poll_seconds: int) -> list:
-    client = get_client()
-    params = {"JobId": job_id}
-
-    start_time = time.time()
-    while True:
-        result = client.call_json("DescribeHunyuanTo3DUVJob", params)
-        resp = result.get("Response", {})
-        status = resp.get("Status")
-
-        elapsed = int(time.time() - start_time)
-        mins, secs = divmod(elapsed, 60)
-        print(f"\rStatus: {status:<6} | Elapsed: {mins:02d}:{secs:02d}", end="", flush=True)
+def wait_for_completion(job_id: str, poll_seconds: float = 1, poll_max: float = 30) -> list:
+    """
+    Wait with hy3d_client.wait_job (status line, backoff from poll_seconds up to poll_max) and
+    return the ResultFile3Ds; raise RuntimeError if the job fails.
+    """
+    client = get_client(POLL_TIMEOUT)
+    resp = wait_job(
+        lambda job_id: client.call_json("DescribeHunyuanTo3DUVJob", {"JobId": job_id}),
+        job_id,
+        poll_seconds,
+        poll_max,
+    )
+    if resp.get("Status") == "FAIL":
+        print("\n❌ Job failed!")
+        raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
+    print("\n✅ Job completed!")
+    return resp.get("ResultFile3Ds") or []
+
+
+def poll_many(job_ids: list[str], poll_seconds: float = 1, poll_max: float = 30) -> dict:
+    """
+    Poll many UV jobs from one thread over the shared client (hy3d_client.poll_jobs: per-job
+    due times and jittered backoff, as in wait_for_completion).
+    Returns {job_id: ResultFile3Ds list, or the error message string for failed jobs}.
+    """
+    client = get_client(POLL_TIMEOUT)
+    return poll_jobs(
+        lambda job_id: client.call_json("DescribeHunyuanTo3DUVJob", {"JobId": job_id}),
+        job_ids,
+        poll_seconds,
+        poll_max,
+    )
 
-        if status == "DONE":
-            print("\n✅ Job completed!")
-            return resp.get("ResultFile3Ds", []) or []
-        if status == "FAIL":
-            print("\n❌ Job failed!")
-            raise RuntimeError(f"{resp.get('ErrorCode')} - {resp.get('ErrorMessage')}")
 
-        time.sleep(poll_seconds)
+_EXT_MAP = {".fbx": "FBX", ".obj": "OBJ", ".glb": "GLB", ".gltf": "GLB"}
 
 
 def detect_file_type(path_or_url: str) -> str:
-    """Detect file type from path/URL extension. API supports FBX, OBJ, GLB."""
-    s = (path_or_url or "").lower().split("?")[0]
-    if s.endswith(".fbx"):
-        return "FBX"
-    if s.endswith(".obj"):
-        return "OBJ"
-    if s.endswith(".glb") or s.endswith(".gltf"):
-        return "GLB"
-    return "GLB"
+    """Detect file type from path/URL extension. API supports FBX, OBJ, GLB (default)."""
+    ext = os.path.splitext((path_or_url or "").split("?", 1)[0])[1].lower()
+    return _EXT_MAP.get(ext, "GLB")
 
 
 def main():
@@ -98,7 +86,8 @@ Examples:
     parser.add_argument("--url", "-u", help="URL of input 3D file (FBX/OBJ/GLB; <30k faces). Cannot be used with --file.")
     parser.add_argument("--file", "-f", help="Path to local file (uploaded via cos_upload; requires cos_bucket in secrets). Cannot be used with --url.")
     parser.add_argument("--type", "-t", choices=["FBX", "OBJ", "GLB"], default=None, help="Input file format (default: auto-detect)")
-    parser.add_argument("--poll", type=int, default=10, help="Polling interval in seconds (default: 10)")
+    parser.add_argument("--poll", type=float, default=1, help="Initial polling interval in seconds; backs off 1.5x per poll (default: 1)")
+    parser.add_argument("--poll-max", type=float, default=30, help="Maximum polling interval in seconds (default: 30)")
     parser.add_argument("--output", "-o", default="./hunyuan_output_uv", help="Output directory (default: ./hunyuan_output_uv)")
     args = parser.parse_args()
 
@@ -125,7 +114,7 @@ Examples:
     try:
         job_id = submit_uv_job(file_url=file_url_arg, file_type=file_type)
         print(f"✅ Submitted. JobId: {job_id}")
-        results = wait_for_completion(job_id, poll_seconds=args.poll)
+        results = wait_for_completion(job_id, poll_seconds=args.poll, poll_max=args.poll_max)
         base_name = None
         if has_file:
             base_name = os.path.splitext(os.path.basename(args.file))[0]
@@ -6,6 +6,9 @@ Run tests for each Hunyuan 3D API endpoint.
 Uses input/ and output/ layout (see paths.py). APIs that need local files
 (image or 3D model) are skipped if the required input is missing.
 
+API tests run concurrently in threads (each is an independent remote job), so a full run
+takes about as long as the slowest job; the query test runs afterwards with the JobId found.
+
 Usage:
   python test_apis.py              # run all tests that have inputs
   python test_apis.py --api pro   # run only Pro text-to-3D
@@ -14,9 +17,14 @@ Usage:
 """
 
 import argparse
+import functools
 import os
+import re
 import subprocess
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Repo root
 ROOT = os.path.dirname(os.path.abspath(__file__))
@@ -29,16 +37,38 @@ from paths import (
     ensure_dirs,
 )
 
+# run_cmd keeps the first and last lines of a child's output (status updates end in \r, so each
+# is a line); the head holds the JobId and the start of any error shown on FAIL
+_OUTPUT_HEAD = 200
+_OUTPUT_TAIL = 4096
+
+# "JobId: <id>" / "Job ID: <id>" as printed by the submit scripts
+_JOB_ID_RE = re.compile(r"Job ?I[Dd]:\s*([^\s,]+)")
+
+
+@functools.lru_cache(maxsize=1)
+def _inventory() -> dict[str, str]:
+    """
+    Map each extension present in input/models/ (lowercase, e.g. ".fbx") to the path of its
+    alphabetically first file. A single scan shared by the has_*_input checks and the tests;
+    call _inventory.cache_clear() to pick up files added since.
+    """
+    found = {}
+    try:
+        with os.scandir(DIR_INPUT_MODELS) as it:
+            for e in it:
+                ext = os.path.splitext(e.name)[1].lower()
+                if ext and (ext not in found or e.name < found[ext]) and e.is_file():
+                    found[ext] = e.name
+    except OSError:  # missing or unreadable directory
+        return {}
+    return {ext: os.path.join(DIR_INPUT_MODELS, name) for ext, name in found.items()}
+
 
-def _first_file(directory: str, *extensions: str) -> str | None:
-    """Return path to first file in directory with one of the given extensions (e.g. .fbx, .glb)."""
-    if not os.path.isdir(directory):
-        return None
-    exts = {e.lower() for e in extensions}
-    for name in sorted(os.listdir(directory)):
-        if os.path.splitext(name)[1].lower() in exts:
-            return os.path.join(directory, name)
-    return None
+def _first_model(*extensions: str) -> str | None:
+    """Return path to the first file in input/models/ with one of the given extensions."""
+    inv = _inventory()
+    return min((inv[e] for e in extensions if e in inv), default=None)
 
 
 def has_pro_input() -> bool:
@@ -50,43 +80,62 @@ def has_rapid_input() -> bool:
 
 
 def has_part_input() -> bool:
-    return _first_file(DIR_INPUT_MODELS, ".fbx") is not None
+    return ".fbx" in _inventory()
 
 
 def has_smart_topology_input() -> bool:
-    return (
-        _first_file(DIR_INPUT_MODELS, ".glb", ".gltf", ".obj", ".fbx", ".stl")
-        is not None
-    )
+    return not _inventory().keys().isdisjoint((".glb", ".gltf", ".obj", ".fbx", ".stl"))
 
 
 def has_texture_edit_input() -> bool:
-    return _first_file(DIR_INPUT_MODELS, ".fbx") is not None
+    return ".fbx" in _inventory()
 
 
 def has_convert_input() -> bool:
-    return _first_file(DIR_INPUT_MODELS, ".glb", ".obj", ".fbx") is not None
+    return not _inventory().keys().isdisjoint((".glb", ".obj", ".fbx"))
 
 
 def run_cmd(args: list[str], timeout: int | None = 600, env: dict | None = None) -> tuple[bool, str]:
-    """Run command; return (success, combined stdout+stderr)."""
-    env = env or os.environ.copy()
+    """
+    Run command; return (success, combined stdout+stderr). env holds overrides merged over the
+    current environment; without it the child simply inherits os.environ.
+    Output is read line by line while the child runs; only the first _OUTPUT_HEAD and last
+    _OUTPUT_TAIL lines are kept, so a long or traceback-heavy run is not buffered whole.
+    """
+    if env is not None:
+        env = {**os.environ, **env}
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             args,
             cwd=ROOT,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=timeout,
+            bufsize=1,
             env=env,
         )
-        out = (result.stdout or "") + (result.stderr or "")
-        return result.returncode == 0, out
-    except subprocess.TimeoutExpired as e:
-        return False, (e.stdout or "") + (e.stderr or "") + "\n(Timed out)"
     except Exception as e:
         return False, str(e)
 
+    head: list[str] = []
+    tail: deque[str] = deque(maxlen=_OUTPUT_TAIL)
+
+    def pump() -> None:
+        for line in proc.stdout:
+            (head if len(head) < _OUTPUT_HEAD else tail).append(line)
+
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        reader.join()
+        return False, "".join(head) + "".join(tail) + "\n(Timed out)"
+    reader.join()
+    return proc.returncode == 0, "".join(head) + "".join(tail)
+
 
 def test_pro(out_dir: str, poll: int) -> tuple[bool, str]:
     script = os.path.join(ROOT, "submit_txt_to_3d_job.py")
@@ -107,7 +156,7 @@ def test_rapid(out_dir: str, poll: int) -> tuple[bool, str]:
 
 
 def test_part(out_dir: str, poll: int) -> tuple[bool, str]:
-    fbx = _first_file(DIR_INPUT_MODELS, ".fbx")
+    fbx = _first_model(".fbx")
     if not fbx:
         return False, "No FBX file in input/models/ (Part job requires FBX)."
     script = os.path.join(ROOT, "submit_part_3d_job.py")
@@ -119,7 +168,7 @@ def test_part(out_dir: str, poll: int) -> tuple[bool, str]:
 
 
 def test_smart_topology(out_dir: str, poll: int) -> tuple[bool, str]:
-    model = _first_file(DIR_INPUT_MODELS, ".glb", ".gltf", ".obj", ".fbx", ".stl")
+    model = _first_model(".glb", ".gltf", ".obj", ".fbx", ".stl")
     if not model:
         return False, "No 3D file (GLB/OBJ/FBX/STL) in input/models/."
     script = os.path.join(ROOT, "submit_smart_topology.py")
@@ -131,7 +180,7 @@ def test_smart_topology(out_dir: str, poll: int) -> tuple[bool, str]:
 
 
 def test_texture_edit(out_dir: str, poll: int) -> tuple[bool, str]:
-    fbx = _first_file(DIR_INPUT_MODELS, ".fbx")
+    fbx = _first_model(".fbx")
     if not fbx:
         return False, "No FBX file in input/models/ (Texture Edit requires FBX)."
     script = os.path.join(ROOT, "submit_texture_edit_job.py")
@@ -143,7 +192,7 @@ def test_texture_edit(out_dir: str, poll: int) -> tuple[bool, str]:
 
 
 def test_convert(out_dir: str) -> tuple[bool, str]:
-    model = _first_file(DIR_INPUT_MODELS, ".glb", ".obj", ".fbx")
+    model = _first_model(".glb", ".obj", ".fbx")
     if not model:
         return False, "No GLB/OBJ/FBX in input/models/ (Convert needs a 3D file)."
     script = os.path.join(ROOT, "convert_3d_format.py")
@@ -165,6 +214,38 @@ def test_query(job_id: str, out_dir: str, poll: int) -> tuple[bool, str]:
     return ok, out
 
 
+# key -> (label, has_input, test(out_dir, poll)); "query" is separate since it needs a JobId
+APIS = {
+    "pro": ("SubmitHunyuanTo3DProJob (text→3D)", has_pro_input, test_pro),
+    "rapid": ("SubmitHunyuanTo3DRapidJob (text→3D)", has_rapid_input, test_rapid),
+    "part": ("SubmitHunyuan3DPartJob", has_part_input, test_part),
+    "smart-topology": ("Submit3DSmartTopologyJob", has_smart_topology_input, test_smart_topology),
+    "texture-edit": ("SubmitHunyuanTo3DTextureEditJob", has_texture_edit_input, test_texture_edit),
+    "convert": ("Convert3DFormat", has_convert_input, lambda out_dir, _poll: test_convert(out_dir)),
+}
+QUERY_LABEL = "QueryHunyuanTo3DProJob"
+
+
+def run_test(key: str, out_dir: str, poll: int, job_id: str = "") -> tuple[bool, str]:
+    """Run the test for one API key; return (success, output)."""
+    if key == "query":
+        return test_query(job_id, out_dir, poll)
+    if key not in APIS:
+        return False, "Unknown API"
+    return APIS[key][2](out_dir, poll)
+
+
+def _report(key: str, label: str, ok: bool, out: str) -> None:
+    print(f"[{key}] {label} ...")
+    if ok:
+        print(f"  ✅ PASS")
+    else:
+        print(f"  ❌ FAIL")
+        if out.strip():
+            for line in out.strip().splitlines()[:15]:
+                print(f"     {line}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Test each Hunyuan 3D API endpoint.",
@@ -173,7 +254,7 @@ def main():
     )
     parser.add_argument(
         "--api",
-        choices=["all", "pro", "rapid", "part", "smart-topology", "texture-edit", "convert", "query"],
+        choices=["all", *APIS, "query"],
         default="all",
         help="Which API(s) to test (default: all). 'query' needs a job_id from a previous run.",
     )
@@ -197,40 +278,28 @@ def main():
 
     ensure_dirs()
 
-    apis = [
-        ("pro", "SubmitHunyuanTo3DProJob (text→3D)", has_pro_input, None),
-        ("rapid", "SubmitHunyuanTo3DRapidJob (text→3D)", has_rapid_input, None),
-        ("part", "SubmitHunyuan3DPartJob", has_part_input, None),
-        ("smart-topology", "Submit3DSmartTopologyJob", has_smart_topology_input, None),
-        ("texture-edit", "SubmitHunyuanTo3DTextureEditJob", has_texture_edit_input, None),
-        ("convert", "Convert3DFormat", has_convert_input, None),
-        ("query", "QueryHunyuanTo3DProJob", lambda: bool(args.job_id), None),
-    ]
+    apis = {key: (label, has_input) for key, (label, has_input, _) in APIS.items()}
+    apis["query"] = (QUERY_LABEL, lambda: bool(args.job_id))
 
     if args.list:
         print("API tests and required input:\n")
-        for key, label, has_input, _ in apis:
+        for key, (label, has_input) in apis.items():
             status = "✓ input present" if has_input() else "✗ missing input (skip)"
             print(f"  {key:20} {label:45} {status}")
         return 0
 
-    to_run = []
     if args.api == "all":
         # Run all that have input; query will be run at the end if we got a job_id from pro/rapid
-        to_run = [a for a in apis if a[0] != "query" and a[2]()]
-        if not to_run:
+        labels = {key: label for key, (label, has_input) in apis.items() if key != "query" and has_input()}
+        if not labels:
             print("No APIs have required input. Add files to input/images/ and input/models/ (see input/README.md).")
             return 1
     else:
-        for a in apis:
-            if a[0] == args.api:
-                if not a[2]():
-                    print(f"Missing input for {a[0]}. {a[1]}")
-                    return 1
-                to_run = [a]
-                break
-        if not to_run:
-            to_run = [(args.api, args.api, lambda: True, None)]
+        label, has_input = apis[args.api]
+        if not has_input():
+            print(f"Missing input for {args.api}. {label}")
+            return 1
+        labels = {args.api: label}
 
     print("=" * 60)
     print("  Hunyuan 3D API tests")
@@ -242,66 +311,39 @@ def main():
     last_job_id = args.job_id
     results = []
 
-    for key, label, _, _ in to_run:
-        out_dir = os.path.join(DIR_OUTPUT_TEST, key)
-        os.makedirs(out_dir, exist_ok=True)
-        print(f"[{key}] {label} ...")
-
-        if key == "pro":
-            ok, out = test_pro(out_dir, args.poll)
-        elif key == "rapid":
-            ok, out = test_rapid(out_dir, args.poll)
-        elif key == "part":
-            ok, out = test_part(out_dir, args.poll)
-        elif key == "smart-topology":
-            ok, out = test_smart_topology(out_dir, args.poll)
-        elif key == "texture-edit":
-            ok, out = test_texture_edit(out_dir, args.poll)
-        elif key == "convert":
-            ok, out = test_convert(out_dir)
-        elif key == "query":
-            ok, out = test_query(last_job_id, out_dir, args.poll)
-        else:
-            ok, out = False, "Unknown API"
+    # Independent remote jobs: run them all at once and report each as it finishes
+    # (printing only from this thread, so PASS/FAIL blocks never interleave)
+    outputs = {}
+    print(f"Running {len(labels)} test(s) concurrently: {', '.join(labels)}")
+    with ThreadPoolExecutor(max_workers=len(labels)) as ex:
+        futures = {}
+        for key in labels:
+            out_dir = os.path.join(DIR_OUTPUT_TEST, key)
+            os.makedirs(out_dir, exist_ok=True)
+            futures[ex.submit(run_test, key, out_dir, args.poll, last_job_id)] = key
+        for future in as_completed(futures):
+            key = futures[future]
+            ok, out = future.result()
+            outputs[key] = (ok, out)
+            _report(key, labels[key], ok, out)
+
+    for key in labels:  # input order, so the JobId picked matches a sequential run
+        ok, out = outputs[key]
 
         # Capture JobId from submit output for later query test
-        if "JobId:" in out or "Job ID:" in out:
-            for line in out.splitlines():
-                line = line.strip()
-                if "JobId:" in line:
-                    parts = line.split("JobId:", 1)
-                    if len(parts) == 2:
-                        last_job_id = parts[1].strip().split()[0].rstrip(",")
-                        break
-                if "Job ID:" in line:
-                    parts = line.split("Job ID:", 1)
-                    if len(parts) == 2:
-                        last_job_id = parts[1].strip().split()[0].rstrip(",")
-                        break
+        m = _JOB_ID_RE.search(out)
+        if m:
+            last_job_id = m.group(1)
 
         results.append((key, ok, out))
-        if ok:
-            print(f"  ✅ PASS")
-        else:
-            print(f"  ❌ FAIL")
-            if out.strip():
-                for line in out.strip().splitlines()[:15]:
-                    print(f"     {line}")
 
     # If we ran "all" and got a job_id from pro/rapid, run query test
     if args.api == "all" and last_job_id:
         out_dir = os.path.join(DIR_OUTPUT_TEST, "query")
         os.makedirs(out_dir, exist_ok=True)
-        print(f"[query] QueryHunyuanTo3DProJob (JobId from above) ...")
         ok, out = test_query(last_job_id, out_dir, args.poll)
         results.append(("query", ok, out))
-        if ok:
-            print(f"  ✅ PASS")
-        else:
-            print(f"  ❌ FAIL")
-            if out.strip():
-                for line in out.strip().splitlines()[:15]:
-                    print(f"     {line}")
+        _report("query", f"{QUERY_LABEL} (JobId from above)", ok, out)
 
     print()
     print("=" * 60)